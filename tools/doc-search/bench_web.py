@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Load test for the QRY doc search web API.
+
+Runs concurrent clients against /api/search and reports requests/sec and
+latency percentiles. Standard library only.
+
+    python bench_web.py --url http://localhost:5001 --clients 50 --requests 5000
+
+Queries are drawn from --queries-file (one per line) or a built-in list;
+with --distinct N each query gets a numbered suffix so up to N distinct
+queries miss the result cache.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.request
+
+DEFAULT_QUERIES = [
+    "AI collaboration procedures", "PostHog integration strategy", "lessons learned",
+    "database migration safety", "semantic search", "deployment checklist",
+    "project methodology", "testing strategy", "backup procedures", "cost tracking",
+]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run(url, queries, clients, total, limit, mode, distinct, seed=0):
+    endpoint = url.rstrip("/") + "/api/search"
+    latencies = []
+    errors = []
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(seed + index)
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            query = rng.choice(queries)
+            if distinct:
+                query = f"{query} {rng.randrange(distinct)}"
+            body = json.dumps({"query": query, "limit": limit, "mode": mode}).encode("utf-8")
+            request = urllib.request.Request(endpoint, data=body, headers={"Content-Type": "application/json"})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": round(wall, 2),
+        "requests_per_sec": round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(ms, 0.50), 1) if ms else None,
+        "p95_ms": round(percentile(ms, 0.95), 1) if ms else None,
+        "p99_ms": round(percentile(ms, 0.99), 1) if ms else None,
+        "mean_ms": round(statistics.mean(ms), 1) if ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /api/search")
+    parser.add_argument("--url", default="http://localhost:5001", help="Server base URL")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests")
+    parser.add_argument("--limit", type=int, default=10, help="Results per search")
+    parser.add_argument("--mode", default="semantic", help="Search mode")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="Vary queries over this many suffixes to defeat the result cache")
+    parser.add_argument("--queries-file", help="File with one query per line")
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries_file:
+        with open(args.queries_file) as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    report = run(args.url, queries, args.clients, args.requests, args.limit, args.mode, args.distinct)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
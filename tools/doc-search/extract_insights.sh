@@ -54,13 +54,28 @@ if ! ./qry-search test > /dev/null 2>&1; then
 fi
 log_success "Search system is working"
 
-# Function to run search and save results
+# Directories planned for archival
+ARCHIVE_DIRS=(other_projects backups enterprise arcade atelier qry-deskhog-prototypes)
+ARCHIVE_FILTERS=()
+for dir in "${ARCHIVE_DIRS[@]}"; do
+    ARCHIVE_FILTERS+=(--directory "$dir")
+done
+
+# Queries are queued here and run together in one search process
+QUERIES=()
+QUERIES_FILE="$EXTRACT_DIR/.queries_${DATE}.jsonl"
+PYTHON="$SCRIPT_DIR/venv/bin/python"
+: > "$QUERIES_FILE"
+
+# Function to queue a search and create its results file
 extract_insights() {
     local query="$1"
     local filename="$2"
     local limit="${3:-50}"
 
-    log_info "Searching for: '$query'"
+    log_info "Queued: '$query'"
+    QUERIES+=("$query|$filename|$limit")
+    printf '{"query": "%s", "file": "%s", "limit": %d}\n' "${query//\"/\\\"}" "$filename" "$limit" >> "$QUERIES_FILE"
 
     # Create file with header
     cat > "$EXTRACT_DIR/$filename" << EOF
@@ -72,31 +87,44 @@ extract_insights() {
 ---
 
 EOF
-
-    # Run search and append results
-    if ./qry-search search "$query" --limit "$limit" >> "$EXTRACT_DIR/$filename" 2>/dev/null; then
-        local result_count=$(grep -c "File:" "$EXTRACT_DIR/$filename" || echo "0")
-        log_success "Found $result_count results for '$query'"
-    else
-        log_warning "Search failed for '$query'"
-        echo "Search failed - no results found" >> "$EXTRACT_DIR/$filename"
-    fi
-
-    echo -e "\n---\n" >> "$EXTRACT_DIR/$filename"
 }
 
-# Function to filter results by directory patterns
-filter_archive_candidates() {
-    local input_file="$1"
-    local output_file="$2"
+# Function to run every queued query in one process and append results to their files
+# Usage: run_queued_searches <file prefix> [search options...]
+run_queued_searches() {
+    local prefix="$1"
+    shift
+    local results_file="$EXTRACT_DIR/.results_${prefix}${DATE}.jsonl"
 
-    log_info "Filtering for archive candidate directories..."
+    log_info "Running ${#QUERIES[@]} queries in one batch..."
+    if ! ./qry-search search --queries-file "$QUERIES_FILE" "$@" > "$results_file" 2>/dev/null; then
+        log_warning "Batch search failed - no results found"
+    fi
 
-    # Extract only results from directories we plan to archive
-    grep -E "(other_projects|backups|enterprise|arcade|atelier|qry-deskhog-prototypes)" "$input_file" > "$output_file" || true
+    # Render JSON Lines in the CLI's text format (one "File:" line per result)
+    "$PYTHON" - "$results_file" "$EXTRACT_DIR" "$prefix" << 'EOF' | while IFS=$'\t' read -r count query; do
+import json
+import sys
+
+results_file, extract_dir, prefix = sys.argv[1:4]
+with open(results_file, encoding="utf-8") as f:
+    for line in f:
+        record = json.loads(line)
+        with open(f"{extract_dir}/{prefix}{record['file']}", "a", encoding="utf-8") as out:
+            for i, result in enumerate(record["results"], 1):
+                out.write(f"\n--- Result {i} (similarity: {result['similarity']:.3f}) ---\n")
+                out.write(f"File: {result['file_path']}\n")
+                out.write(f"Directory: {result['directory']}\n")
+                out.write(f"Preview: {result['preview']}\n")
+            if not record["results"]:
+                out.write("No results found.\n")
+            out.write("\n---\n\n")
+        print(f"{record['count']}\t{record['query']}")
+EOF
+        log_success "Found $count results for '$query'"
+    done
 
-    local filtered_count=$(grep -c "File:" "$output_file" 2>/dev/null || echo "0")
-    log_info "Filtered to $filtered_count results from archive candidates"
+    rm -f "$results_file"
 }
 
 echo "🔍 EXTRACTING METHODOLOGICAL INSIGHTS"
@@ -164,13 +192,20 @@ extract_insights "semantic search" "projects_search.md" 20
 extract_insights "local AI optimization" "projects_ai.md" 25
 extract_insights "enterprise solution" "projects_enterprise.md" 15
 
+echo
+echo "🔎 RUNNING QUEUED SEARCHES"
+echo "========================="
+
+run_queued_searches ""
+
 echo
 echo "📊 CREATING ARCHIVE-SPECIFIC EXTRACTIONS"
 echo "========================================"
 
 # Create filtered versions focusing on archive candidates
-for file in "$EXTRACT_DIR"/*.md; do
-    if [[ -f "$file" ]]; then
+for entry in "${QUERIES[@]}"; do
+    IFS='|' read -r query file limit <<< "$entry"
+    if [[ -f "$EXTRACT_DIR/$file" ]]; then
         filename=$(basename "$file" .md)
         filtered_file="$EXTRACT_DIR/archive_${filename}.md"
 
@@ -192,12 +227,13 @@ This file contains insights specifically from directories that will be archived:
 ---
 
 EOF
-
-        # Filter and append
-        filter_archive_candidates "$file" "$filtered_file"
     fi
 done
 
+# Directory filters run inside the index, so every result comes from these directories
+run_queued_searches "archive_" "${ARCHIVE_FILTERS[@]}"
+rm -f "$QUERIES_FILE"
+
 echo
 echo "📋 CREATING EXTRACTION SUMMARY"
 echo "=============================="
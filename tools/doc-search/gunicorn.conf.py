@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for serving the QRY doc search web interface in production.
+
+    gunicorn -c gunicorn.conf.py web_demo:app
+
+Each worker process opens the on-disk index itself after forking and only
+reads from it. With QRY_SEARCH_VECTOR_BACKEND=numpy the vectors are
+memory-mapped, so all workers share one copy through the page cache; a
+ChromaDB index is loaded into every worker's memory instead.
+
+Environment:
+    QRY_SEARCH_BIND      Address to listen on (default 0.0.0.0:5001)
+    QRY_SEARCH_WORKERS   Worker processes (default: CPU count, at most 4)
+    QRY_SEARCH_THREADS   Request threads per worker (default 8)
+    QRY_SEARCH_HEALTH_INTERVAL  Seconds between each worker's /health probes (default 10)
+    QRY_SEARCH_*         Index options, see ENV_OPTIONS in web_demo.py
+"""
+
+import os
+
+bind = os.environ.get("QRY_SEARCH_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("QRY_SEARCH_WORKERS", min(4, os.cpu_count() or 1)))
+worker_class = "gthread"
+threads = int(os.environ.get("QRY_SEARCH_THREADS", 8))
+os.environ.setdefault("QRY_SEARCH_THREADS", str(threads))
+
+# ChromaDB clients and SQLite connections must not cross a fork, so the app
+# is loaded in each worker rather than preloaded in the master
+preload_app = False
+timeout = 60
+
+
+def post_worker_init(worker):
+    """Open the index, warm the embedding connection and start health probing."""
+    from web_demo import warm_up
+
+    warm_up()
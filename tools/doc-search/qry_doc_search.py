@@ -8,21 +8,1126 @@ Uses ChromaDB + Ollama embeddings for local-first document discovery.
 Based on the uroboro AI capture search system.
 """
 
+import time
+
+# Taken before the remaining imports so --timing can report module load time
+_IMPORT_STARTED = time.perf_counter()
+
 import os
+import sys
+import copy
 import sqlite3
 import logging
-import requests
 import json
 import hashlib
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+import math
+import re
+import threading
+import fnmatch
+import uuid
+from array import array
+from collections import Counter, deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Iterable, Iterator
 from datetime import datetime
 
-try:
-    import chromadb
-    from chromadb.config import Settings
-except ImportError:
-    raise ImportError("ChromaDB not installed. Run: pip install chromadb")
+# chromadb, requests and numpy are imported where they are first needed, so
+# commands that never touch them (--help, lexical search, stats) skip the cost
+if TYPE_CHECKING:
+    import requests
+
+
+# Directories never indexed (hidden directories are skipped as well)
+EXCLUDED_DIRS = {'node_modules', '__pycache__', 'venv', '.git'}
+
+# Chunks fetched per requested result before aggregating to documents
+CHUNK_OVERSAMPLE = 5
+
+# Reciprocal-rank-fusion constant for hybrid search
+RRF_K = 60
+
+SEARCH_MODES = ("semantic", "lexical", "hybrid")
+
+class LRUCache:
+    """Small thread-safe LRU cache with an optional per-entry TTL."""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Very common words carry no ranking signal for BM25
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'with'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used by the lexical index."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """BM25 inverted index over chunks, persisted in SQLite.
+
+    Works without any model call, so it doubles as the search fallback
+    when the embedding backend is unavailable.
+    """
+
+    def __init__(self, db_path: str, k1: float = 1.5, b: float = 0.75):
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Postings are all integers: each chunk id and term is stored once,
+        # and the by-chunk index needed for deletes stays small
+        legacy = "chunk_id" in [row[1] for row in self.conn.execute("PRAGMA table_info(postings)")]
+        with self.conn:
+            if legacy:
+                self.conn.execute("DROP INDEX IF EXISTS chunks_doc")
+                self.conn.execute("DROP INDEX IF EXISTS postings_chunk")
+                self.conn.execute("ALTER TABLE chunks RENAME TO legacy_chunks")
+                self.conn.execute("ALTER TABLE postings RENAME TO legacy_postings")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL UNIQUE,
+                    doc_id TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS chunks_doc ON chunks (doc_id)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS terms (
+                    id INTEGER PRIMARY KEY,
+                    term TEXT NOT NULL UNIQUE
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    term INTEGER NOT NULL,
+                    chunk INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, chunk)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS postings_chunk ON postings (chunk)")
+            if legacy:
+                self._migrate_legacy()
+        if legacy:
+            self.conn.execute("VACUUM")
+
+    def _migrate_legacy(self):
+        """Copy an index from the text-keyed schema into the current one."""
+        self.conn.execute("""
+            INSERT INTO chunks (chunk_id, doc_id, length, metadata)
+            SELECT chunk_id, doc_id, length, metadata FROM legacy_chunks
+        """)
+        self.conn.execute("INSERT INTO terms (term) SELECT DISTINCT term FROM legacy_postings")
+        self.conn.execute("""
+            INSERT INTO postings
+            SELECT t.id, c.id, p.tf FROM legacy_postings p
+            JOIN terms t ON t.term = p.term JOIN chunks c ON c.chunk_id = p.chunk_id
+        """)
+        self.conn.execute("DROP TABLE legacy_postings")
+        self.conn.execute("DROP TABLE legacy_chunks")
+
+    def _term_ids(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Ids of the given terms, adding the missing ones (caller holds the lock)."""
+        terms = list(terms)
+        self.conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", [(term,) for term in terms])
+        ids = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            ids.update(self.conn.execute(
+                f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return ids
+
+    def _row_ids(self, chunk_ids: List[str]) -> Dict[str, int]:
+        """Integer ids of the given chunks (caller holds the lock)."""
+        ids = {}
+        for start in range(0, len(chunk_ids), 500):
+            chunk = chunk_ids[start:start + 500]
+            ids.update(self.conn.execute(
+                f"SELECT chunk_id, id FROM chunks WHERE chunk_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return ids
+
+    def add(self, records: List[Dict[str, Any]]):
+        """Index chunk records ({"id", "text", "metadata"})."""
+        chunk_rows = []
+        chunk_counts = []
+        for record in records:
+            tokens = tokenize(record['text'])
+            chunk_rows.append((record['id'], record['metadata']['doc_id'], len(tokens),
+                               json.dumps(record['metadata'])))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            chunk_counts.append(counts)
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM postings WHERE chunk = (SELECT id FROM chunks WHERE chunk_id = ?)",
+                [(row[0],) for row in chunk_rows]
+            )
+            self.conn.executemany(
+                "INSERT INTO chunks (chunk_id, doc_id, length, metadata) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(chunk_id) DO UPDATE SET doc_id = excluded.doc_id, "
+                "length = excluded.length, metadata = excluded.metadata",
+                chunk_rows
+            )
+            chunk_ids = self._row_ids([row[0] for row in chunk_rows])
+            term_ids = self._term_ids({term for counts in chunk_counts for term in counts})
+            self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?)", [
+                (term_ids[term], chunk_ids[row[0]], tf)
+                for row, counts in zip(chunk_rows, chunk_counts) for term, tf in counts.items()
+            ])
+
+    def delete_documents(self, doc_ids: List[str]):
+        """Remove every chunk belonging to the given documents."""
+        with self._lock, self.conn:
+            for doc_id in doc_ids:
+                self.conn.execute(
+                    "DELETE FROM postings WHERE chunk IN (SELECT id FROM chunks WHERE doc_id = ?)",
+                    (doc_id,)
+                )
+                self.conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+
+    def clear(self):
+        """Drop the whole index."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM postings")
+            self.conn.execute("DELETE FROM chunks")
+            self.conn.execute("DELETE FROM terms")
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def search(self, query: str, limit: int, doc_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Score chunks against the query with BM25.
+
+        With ``doc_ids``, only chunks of those documents are scored; term
+        statistics still come from the whole corpus.
+
+        Returns:
+            Up to ``limit`` {"id", "score", "metadata"} dicts, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            total, avg_length = self.conn.execute("SELECT COUNT(*), AVG(length) FROM chunks").fetchone()
+            if not total:
+                return []
+            term_ids = dict(self.conn.execute(
+                f"SELECT id, term FROM terms WHERE term IN ({','.join('?' * len(terms))})", terms
+            ).fetchall())
+            if not term_ids:
+                return []
+            placeholders = ",".join("?" * len(term_ids))
+            doc_freqs = dict(self.conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({placeholders}) GROUP BY term",
+                list(term_ids)
+            ).fetchall())
+            sql = (f"SELECT p.term, c.chunk_id, p.tf, c.length FROM postings p "
+                   f"JOIN chunks c ON c.id = p.chunk WHERE p.term IN ({placeholders})")
+            params = list(term_ids)
+            if doc_ids is not None:
+                sql += " AND c.doc_id IN (SELECT value FROM json_each(?))"
+                params.append(json.dumps(list(doc_ids)))
+            rows = self.conn.execute(sql, params).fetchall()
+
+        avg_length = avg_length or 1.0
+        scores = {}
+        for term, chunk_id, tf, length in rows:
+            df = doc_freqs[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        if not best:
+            return []
+
+        with self._lock:
+            metadata_rows = dict(self.conn.execute(
+                f"SELECT chunk_id, metadata FROM chunks WHERE chunk_id IN ({','.join('?' * len(best))})",
+                [chunk_id for chunk_id, _ in best]
+            ).fetchall())
+
+        return [{"id": chunk_id, "score": score, "metadata": json.loads(metadata_rows[chunk_id])}
+                for chunk_id, score in best]
+
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+\S')
+
+
+def decode_text(raw: bytes) -> str:
+    """Decode file bytes the way text-mode reads do: UTF-8, bad bytes dropped, newlines as \\n."""
+    return raw.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def chunk_markdown(content: str, max_chars: int = 2000) -> List[Dict[str, Any]]:
+    """Split markdown into bounded-size chunks on heading and paragraph boundaries.
+
+    Sections (a heading plus its body) are packed together while they fit in
+    ``max_chars``; oversized sections are split on blank lines, and oversized
+    paragraphs are hard-wrapped at whitespace.
+
+    Returns:
+        List of {"text", "heading"} dicts, in document order
+    """
+    # Split into sections at headings, ignoring '#' lines inside code fences
+    sections = []
+    current = []
+    heading = ""
+    in_fence = False
+    for line in content.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and HEADING_PATTERN.match(line) and current:
+            sections.append((heading, "".join(current)))
+            current = []
+        if not in_fence and HEADING_PATTERN.match(line):
+            heading = line.strip().lstrip("#").strip()
+        current.append(line)
+    if current:
+        sections.append((heading, "".join(current)))
+
+    # Break oversized sections into paragraph-sized pieces
+    pieces = []
+    for section_heading, text in sections:
+        if len(text) <= max_chars:
+            pieces.append((section_heading, text))
+            continue
+        for paragraph in re.split(r'(\n\s*\n)', text):
+            while len(paragraph) > max_chars:
+                cut = paragraph.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                pieces.append((section_heading, paragraph[:cut]))
+                paragraph = paragraph[cut:]
+            if paragraph:
+                pieces.append((section_heading, paragraph))
+
+    # Pack pieces greedily into chunks
+    chunks = []
+    buffer = ""
+    buffer_heading = ""
+    for piece_heading, text in pieces:
+        if buffer and len(buffer) + len(text) > max_chars:
+            chunks.append({"text": buffer, "heading": buffer_heading})
+            buffer = ""
+        if not buffer:
+            buffer_heading = piece_heading
+        buffer += text
+    if buffer:
+        chunks.append({"text": buffer, "heading": buffer_heading})
+
+    return [chunk for chunk in chunks if chunk["text"].strip()]
+
+
+# Passages for snippets are sentences or lines
+PASSAGE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+FRONTMATTER_PATTERN = re.compile(r'\A---\s*\n.*?\n---\s*\n', re.DOTALL)
+
+
+def _trim_passage(passage: str, terms: set, max_chars: int) -> str:
+    """Cut a passage to ``max_chars``, keeping its first query term in view."""
+    if len(passage) <= max_chars:
+        return passage
+    first = min((m.start() for m in TOKEN_PATTERN.finditer(passage.lower()) if m.group() in terms), default=0)
+    start = max(0, first - max_chars // 4)
+    if start:
+        # Don't begin mid-word
+        space = passage.find(" ", start)
+        start = space + 1 if 0 <= space < first else start
+    end = start + max_chars
+    if end < len(passage):
+        space = passage.rfind(" ", start, end)
+        end = space if space > first else end
+    return ("..." if start else "") + passage[start:end].strip() + ("..." if end < len(passage) else "")
+
+
+def extract_snippets(texts: List[str], query: str, max_chars: int = 200, count: int = 2) -> List[str]:
+    """Pick the passages of ``texts`` that best match ``query``.
+
+    Passages score by the number of distinct query terms they contain (then
+    by total hits); the best ``count`` are returned in document order, each
+    trimmed to ``max_chars`` around its first match. A hit with no term
+    overlap (purely semantic) gets the start of its best chunk, minus any
+    YAML frontmatter.
+    """
+    terms = set(tokenize(query))
+    passages = []
+    seen = set()
+    for text in texts:
+        for passage in PASSAGE_SPLIT.split(FRONTMATTER_PATTERN.sub("", text)):
+            passage = " ".join(passage.split())
+            if passage and passage not in seen:
+                seen.add(passage)
+                passages.append(passage)
+
+    scored = []
+    for position, passage in enumerate(passages):
+        hits = [token for token in tokenize(passage) if token in terms]
+        if hits:
+            scored.append((len(set(hits)), len(hits), -position, passage))
+
+    if not scored:
+        lead = " ".join(FRONTMATTER_PATTERN.sub("", texts[0]).split()) if texts else ""
+        return [lead[:max_chars] + "..." if len(lead) > max_chars else lead] if lead else []
+
+    best = sorted(scored, reverse=True)[:count]
+    best.sort(key=lambda item: -item[2])
+    return [_trim_passage(item[3], terms, max_chars) for item in best]
+
+
+class BackendMismatchError(ValueError):
+    """The index directory belongs to a different vector backend."""
+
+
+class VectorStore:
+    """Interface for the chunk vector index used by QRYDocSearch.
+
+    Hits are returned as {"id", "document", "metadata", "distance"} dicts,
+    best first; every chunk's metadata carries its parent ``doc_id``.
+    """
+
+    name = "base"
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               documents: List[str], metadatas: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def delete_documents(self, doc_ids: List[str]):
+        raise NotImplementedError
+
+    def replace_documents(self, doc_ids: List[str], ids: List[str], embeddings: List[List[float]],
+                          documents: List[str], metadatas: List[Dict[str, Any]]):
+        """Drop every chunk of ``doc_ids`` and upsert the given rows; backends override this to write once."""
+        self.delete_documents(doc_ids)
+        if ids:
+            self.upsert(ids, embeddings, documents, metadatas)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def compact(self, force: bool = False) -> Dict[str, Any]:
+        """Reclaim space left by deleted rows; a no-op for stores that manage this themselves."""
+        return {"compacted": False}
+
+    def reopen(self):
+        """Pick up writes made by other processes; a no-op for stores that already do."""
+
+    def query(self, embedding: List[float], n_results: int,
+              doc_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Nearest chunks; restricted to chunks of ``doc_ids`` before top-k when given."""
+        raise NotImplementedError
+
+    def query_many(self, embeddings: List[List[float]], n_results: int,
+                   doc_ids: Optional[Iterable[str]] = None) -> List[List[Dict[str, Any]]]:
+        """``query`` for several embeddings at once; backends override this to batch."""
+        return [self.query(embedding, n_results, doc_ids) for embedding in embeddings]
+
+    def get_documents(self, ids: List[str]) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def all_metadatas(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def get_all(self) -> Dict[str, Any]:
+        """Every row as parallel ``ids``/``embeddings``/``documents``/``metadatas`` lists."""
+        raise NotImplementedError
+
+
+class ChromaVectorStore(VectorStore):
+    """Vector store backed by a ChromaDB persistent collection."""
+
+    name = "chroma"
+
+    def __init__(self, db_path: str):
+        try:
+            import chromadb
+        except ImportError:
+            raise ImportError("ChromaDB not installed. Run: pip install chromadb")
+
+        self.chromadb = chromadb
+        self.db_path = db_path
+        self.client = None
+        self.collection = None
+        self.reopen()
+
+    def reopen(self):
+        # A client keeps its HNSW index in memory and never sees other
+        # processes' writes, so drop the cached system and open a fresh one
+        from chromadb.api.client import SharedSystemClient
+        from chromadb.config import Settings
+
+        if self.client is not None:
+            SharedSystemClient.clear_system_cache()
+
+        # Initialize ChromaDB client
+        self.client = self.chromadb.PersistentClient(
+            path=self.db_path,
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
+        )
+
+        self.collection = self._open_collection()
+
+    def _open_collection(self):
+        # Get or create collection
+        return self.client.get_or_create_collection(
+            name="qry_docs",
+            metadata={"description": "QRY documentation semantic search"}
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete_documents(self, doc_ids):
+        self.collection.delete(where={"doc_id": {"$in": doc_ids}})
+
+    def clear(self):
+        # Recreate rather than empty the collection so a new dimension is accepted
+        self.client.delete_collection(self.collection.name)
+        self.collection = self._open_collection()
+
+    def query(self, embedding, n_results, doc_ids=None):
+        return self.query_many([embedding], n_results, doc_ids)[0]
+
+    def query_many(self, embeddings, n_results, doc_ids=None):
+        count = self.collection.count()
+        if count == 0:
+            return [[] for _ in embeddings]
+        # Metadata predicate evaluated inside ChromaDB, ahead of the nearest-neighbour cut
+        where = {"doc_id": {"$in": list(doc_ids)}} if doc_ids is not None else None
+        results = self.collection.query(
+            query_embeddings=list(embeddings),
+            n_results=min(n_results, count),
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            [
+                {
+                    "id": results["ids"][q][i],
+                    "document": results["documents"][q][i],
+                    "metadata": results["metadatas"][q][i],
+                    "distance": results["distances"][q][i]
+                }
+                for i in range(len(results["ids"][q]))
+            ]
+            for q in range(len(results["ids"]))
+        ]
+
+    def get_documents(self, ids):
+        fetched = self.collection.get(ids=ids, include=["documents"])
+        return dict(zip(fetched["ids"], fetched["documents"]))
+
+    def all_metadatas(self):
+        return self.collection.get(include=["metadatas"])["metadatas"]
+
+    def get_all(self):
+        fetched = self.collection.get(include=["embeddings", "documents", "metadatas"])
+        return {"ids": fetched["ids"], "embeddings": fetched["embeddings"],
+                "documents": fetched["documents"], "metadatas": fetched["metadatas"]}
+
+
+class NumpyVectorStore(VectorStore):
+    """Vector store keeping normalised vectors in memory-mapped ``.npy`` segments.
+
+    Every write appends its rows as a new, never-modified segment and records
+    them in a SQLite catalogue that also holds each row's metadata and chunk
+    text. Replaced and deleted rows are tombstoned by dropping their
+    catalogue entry; ``compact`` rewrites the live rows into one segment. A
+    write is published by a single catalogue transaction that bumps its
+    generation, so readers always see segments and rows that belong
+    together. Readers map segments read-only, so several processes share one
+    copy through the page cache. Distances are cosine distances
+    (1 - cosine similarity).
+
+    Every segment also stores int8 (per-dimension scaled) and 1-bit sign
+    codes. With ``quantization`` set, queries scan those compact codes first
+    and re-rank a shortlist of ``rerank_factor * n_results`` rows against the
+    full-precision vectors, which are only paged in for the shortlist.
+    """
+
+    name = "numpy"
+
+    # Rows scored per block when scanning, to bound temporary memory
+    SCAN_BLOCK = 8192
+
+    # compact() without force merges once there are more segments than this,
+    # or more dead rows than this share of live ones
+    MAX_SEGMENTS = 16
+    MAX_DEAD_RATIO = 0.5
+
+    def __init__(self, db_path: str, dtype: str = "float32",
+                 quantization: str = "none", rerank_factor: int = 10):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("NumPy not installed. Run: pip install numpy")
+
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}")
+
+        self.np = np
+        self.dtype = np.dtype(dtype)
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+        self.segments_dir = os.path.join(db_path, "numpy_segments")
+        self.catalog_path = os.path.join(db_path, "numpy_catalog.db")
+        # Single-matrix layout of earlier versions, migrated on open
+        self.legacy_paths = [os.path.join(db_path, name) for name in
+                             ("vectors_meta.json", "vectors.npy", "vectors_int8.npy", "vectors_binary.npy")]
+        self._lock = threading.Lock()
+        self._loaded_generation = None
+        self._matrix = None
+        self._int8 = None
+        self._int8_scale = None
+        self._binary = None
+        # Set-bit counts for every byte value, for Hamming distances
+        self._popcount = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+        self._ids = []
+        self._metadatas = []
+        self._row_doc_ids = None
+
+        os.makedirs(self.segments_dir, exist_ok=True)
+        # Autocommit; transactions are opened explicitly so a reader's
+        # queries all see one snapshot and a writer's changes land at once
+        self.conn = sqlite3.connect(self.catalog_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    file TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    dim INTEGER NOT NULL,
+                    int8_scale BLOB NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS rows (
+                    id TEXT PRIMARY KEY,
+                    doc_id TEXT NOT NULL,
+                    segment INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    document TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS rows_doc ON rows (doc_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS rows_segment ON rows (segment, position)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+        if os.path.exists(self.legacy_paths[0]):
+            self._migrate_legacy()
+        self._load()
+
+    @contextmanager
+    def _transaction(self, mode: str = "IMMEDIATE"):
+        """Run a block in one SQLite transaction (DEFERRED for readers)."""
+        self.conn.execute(f"BEGIN {mode}")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _migrate_legacy(self):
+        """Move an index kept as one ``vectors.npy`` plus JSON sidecar into a segment."""
+        with open(self.legacy_paths[0], 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar["ids"] and not self.conn.execute("SELECT 1 FROM rows LIMIT 1").fetchone():
+            matrix = self.np.load(self.legacy_paths[1])
+            self._publish([], sidecar["ids"], self.np.asarray(matrix, dtype=self.np.float32),
+                          sidecar["documents"], sidecar["metadatas"])
+        for path in self.legacy_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _generation(self) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def _bump_generation(self):
+        self.conn.execute(
+            "INSERT INTO meta VALUES ('generation', 1) ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+
+    def _segment_path(self, file: str, kind: str = "") -> str:
+        return os.path.join(self.segments_dir, f"{file}{kind}.npy")
+
+    def _load(self):
+        """(Re)map the segments if the catalogue changed since the last load."""
+        if self._generation() == self._loaded_generation:
+            return
+        for attempt in range(3):
+            try:
+                self._load_snapshot()
+                return
+            except FileNotFoundError:
+                # A compaction in another process removed a segment we had
+                # just read from the catalogue; its successor is published
+                if attempt == 2:
+                    raise
+
+    def _load_snapshot(self):
+        np = self.np
+        with self._transaction("DEFERRED"):
+            generation = self._generation()
+            segments = self.conn.execute(
+                "SELECT id, file, rows, int8_scale FROM segments WHERE id IN (SELECT segment FROM rows) ORDER BY id"
+            ).fetchall()
+            rows = self.conn.execute(
+                "SELECT id, doc_id, segment, position, metadata FROM rows ORDER BY segment, position"
+            ).fetchall()
+
+        if not rows:
+            self._reset()
+        elif len(segments) == 1 and segments[0][2] == len(rows):
+            # One segment without tombstones: map it as it is
+            file = segments[0][1]
+            self._matrix = np.load(self._segment_path(file), mmap_mode='r')
+            self._int8 = np.load(self._segment_path(file, ".int8"), mmap_mode='r')
+            self._binary = np.load(self._segment_path(file, ".binary"), mmap_mode='r')
+            self._int8_scale = np.frombuffer(segments[0][3], dtype=np.float32)
+        else:
+            # Gather the live rows; codes are rebuilt over the merged matrix
+            # because each segment has its own int8 scales
+            row_segments = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+            positions = np.fromiter((row[3] for row in rows), dtype=np.int64, count=len(rows))
+            parts = []
+            for segment_id, file, _, _ in segments:
+                vectors = np.load(self._segment_path(file), mmap_mode='r')
+                parts.append(np.asarray(vectors[positions[row_segments == segment_id]], dtype=self.dtype))
+            self._matrix = np.concatenate(parts)
+            self._int8, self._int8_scale, self._binary = self._quantize(
+                np.asarray(self._matrix, dtype=np.float32)
+            )
+
+        if rows:
+            self._ids = [row[0] for row in rows]
+            self._metadatas = [json.loads(row[4]) for row in rows]
+            # Parent document per row, for vectorised pre-filtering
+            self._row_doc_ids = np.array([row[1] for row in rows])
+        self._loaded_generation = generation
+
+    def _reset(self):
+        self._matrix, self._ids, self._metadatas = None, [], []
+        self._int8 = self._int8_scale = self._binary = None
+        self._row_doc_ids = None
+
+    def _quantize(self, matrix):
+        """Build int8 codes (with per-dimension scales) and packed sign bits."""
+        np = self.np
+        max_abs = np.abs(matrix).max(axis=0) if len(matrix) else np.ones(matrix.shape[1], dtype=np.float32)
+        max_abs[max_abs == 0] = 1.0
+        scale = (127.0 / max_abs).astype(np.float32)
+        int8_codes = np.clip(np.rint(matrix * scale), -127, 127).astype(np.int8)
+        binary_codes = np.packbits(matrix > 0, axis=1)
+        return int8_codes, scale, binary_codes
+
+    def _write_segment(self, matrix):
+        """Save normalised rows and their codes as a new, unpublished segment."""
+        file = uuid.uuid4().hex
+        int8_codes, int8_scale, binary_codes = self._quantize(matrix)
+        self.np.save(self._segment_path(file), matrix.astype(self.dtype, copy=False))
+        self.np.save(self._segment_path(file, ".int8"), int8_codes)
+        self.np.save(self._segment_path(file, ".binary"), binary_codes)
+        return file, int8_scale
+
+    def _remove_segments(self, files: List[str]):
+        for file in files:
+            for kind in ("", ".int8", ".binary"):
+                path = self._segment_path(file, kind)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _drop_empty_segments(self) -> List[str]:
+        """Uncatalogue segments without live rows; returns their files (inside a transaction)."""
+        empty = self.conn.execute(
+            "SELECT id, file FROM segments WHERE id NOT IN (SELECT segment FROM rows)"
+        ).fetchall()
+        self.conn.executemany("DELETE FROM segments WHERE id = ?", [(row[0],) for row in empty])
+        return [row[1] for row in empty]
+
+    def _publish(self, doc_ids, ids, matrix, documents, metadatas):
+        """Tombstone the chunks of ``doc_ids`` and ``ids`` and append the given rows in one write.
+
+        The segment file is written first; nothing refers to it until the
+        catalogue transaction commits. Segments left without live rows are
+        removed afterwards. Like other readers, this store remaps on its next
+        read (caller holds the lock).
+        """
+        file, int8_scale = self._write_segment(matrix) if ids else (None, None)
+        try:
+            with self._transaction():
+                changed = 0
+                for column, values in (("doc_id", doc_ids), ("id", ids)):
+                    changed += self.conn.executemany(
+                        f"DELETE FROM rows WHERE {column} = ?", [(value,) for value in values]
+                    ).rowcount
+                dropped = self._drop_empty_segments()
+                if file is not None:
+                    dims = {row[0] for row in self.conn.execute("SELECT DISTINCT dim FROM segments")}
+                    if dims and dims != {matrix.shape[1]}:
+                        raise ValueError(
+                            f"Embedding dimension {matrix.shape[1]} does not match the index "
+                            f"({', '.join(map(str, sorted(dims)))}); rebuild with embed --force"
+                        )
+                    segment = self.conn.execute(
+                        "INSERT INTO segments (file, rows, dim, int8_scale) VALUES (?, ?, ?, ?)",
+                        (file, len(ids), matrix.shape[1], int8_scale.tobytes())
+                    ).lastrowid
+                    self.conn.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?, ?)", [
+                        (row_id, metadata.get("doc_id", ""), segment, position, document, json.dumps(metadata))
+                        for position, (row_id, document, metadata) in enumerate(zip(ids, documents, metadatas))
+                    ])
+                elif not changed:
+                    return
+                self._bump_generation()
+        except BaseException:
+            if file is not None:
+                self._remove_segments([file])
+            raise
+        self._remove_segments(dropped)
+
+    def _normalise(self, vectors):
+        vectors = self.np.asarray(vectors, dtype=self.np.float32)
+        norms = self.np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def count(self):
+        with self._lock:
+            self._load()
+            return len(self._ids)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        with self._lock:
+            self._publish([], list(ids), self._normalise(embeddings), list(documents), list(metadatas))
+
+    def replace_documents(self, doc_ids, ids, embeddings, documents, metadatas):
+        with self._lock:
+            self._publish(list(doc_ids), list(ids), self._normalise(embeddings) if ids else None,
+                          list(documents), list(metadatas))
+
+    def delete_documents(self, doc_ids):
+        self.replace_documents(doc_ids, [], [], [], [])
+
+    def clear(self):
+        with self._lock:
+            with self._transaction():
+                files = [row[0] for row in self.conn.execute("SELECT file FROM segments")]
+                self.conn.execute("DELETE FROM rows")
+                self.conn.execute("DELETE FROM segments")
+                self._bump_generation()
+            self._remove_segments(files)
+
+    def compact(self, force: bool = False) -> Dict[str, Any]:
+        """Rewrite the live rows as one segment, dropping tombstoned ones.
+
+        Without ``force`` this only happens once there are more than
+        MAX_SEGMENTS segments or dead rows exceed MAX_DEAD_RATIO of the live
+        ones. Gives up (without error) if another process wrote meanwhile.
+        """
+        with self._lock:
+            self._load()
+            segments, stored = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM segments").fetchone()
+            live = len(self._ids)
+            report = {"compacted": False, "segments": segments, "rows": live, "dead_rows": stored - live}
+            if segments <= 1 and stored == live:
+                return report
+            if not force and segments <= self.MAX_SEGMENTS and stored - live <= live * self.MAX_DEAD_RATIO:
+                return report
+
+            generation = self._loaded_generation
+            file, int8_scale = self._write_segment(self.np.asarray(self._matrix, dtype=self.np.float32))
+            try:
+                with self._transaction():
+                    if self._generation() != generation:
+                        self._remove_segments([file])
+                        return report
+                    segment = self.conn.execute(
+                        "INSERT INTO segments (file, rows, dim, int8_scale) VALUES (?, ?, ?, ?)",
+                        (file, live, self._matrix.shape[1], int8_scale.tobytes())
+                    ).lastrowid
+                    self.conn.executemany("UPDATE rows SET segment = ?, position = ? WHERE id = ?", [
+                        (segment, position, row_id) for position, row_id in enumerate(self._ids)
+                    ])
+                    dropped = self._drop_empty_segments()
+                    self._bump_generation()
+            except BaseException:
+                self._remove_segments([file])
+                raise
+            self._remove_segments(dropped)
+            report["compacted"] = True
+            return report
+
+    def query(self, embedding, n_results, doc_ids=None):
+        return self.query_many([embedding], n_results, doc_ids)[0]
+
+    def query_many(self, embeddings, n_results, doc_ids=None):
+        with self._lock:
+            self._load()
+            # One generation's arrays: a concurrent reload swaps them all
+            snapshot = self._snapshot()
+            ids, metadatas, row_doc_ids = self._ids, self._metadatas, self._row_doc_ids
+        matrix = snapshot[0]
+        if matrix is None or not ids:
+            return [[] for _ in embeddings]
+
+        rows = None
+        if doc_ids is not None:
+            rows = self.np.flatnonzero(self.np.isin(row_doc_ids, list(doc_ids)))
+            if not len(rows):
+                return [[] for _ in embeddings]
+
+        queries = self._normalise(embeddings)
+        if self.quantization == "none":
+            # One matrix-matrix product scores every chunk against every query
+            candidates = matrix if rows is None else matrix[rows]
+            scores = (candidates @ queries.T.astype(candidates.dtype)).astype(self.np.float32)
+            found = []
+            for column in scores.T:
+                top = self._top_k(column, n_results)
+                found.append((top if rows is None else rows[top], column[top]))
+        else:
+            found = [self._search(query, n_results, self.quantization, snapshot, rows) for query in queries]
+
+        # Chunk text stays in the catalogue; fetch it for the hits only
+        documents = self.get_documents(list({ids[i] for top, _ in found for i in top}))
+        return [
+            [
+                {
+                    "id": ids[i],
+                    "document": documents.get(ids[i], ""),
+                    "metadata": metadatas[i],
+                    "distance": float(1.0 - similarity)
+                }
+                for i, similarity in zip(top, similarities)
+            ]
+            for top, similarities in found
+        ]
+
+    def _top_k(self, scores, k: int):
+        """Indices of the ``k`` highest scores, best first."""
+        k = min(k, len(scores))
+        top = self.np.argpartition(-scores, k - 1)[:k]
+        return top[self.np.argsort(-scores[top])]
+
+    def _scan(self, codes, score_block):
+        """Score all rows of ``codes`` block by block."""
+        return self.np.concatenate([
+            score_block(codes[start:start + self.SCAN_BLOCK])
+            for start in range(0, len(codes), self.SCAN_BLOCK)
+        ])
+
+    def _snapshot(self):
+        """The current matrix, int8 codes, int8 scales and sign codes (caller holds the lock)."""
+        return self._matrix, self._int8, self._int8_scale, self._binary
+
+    def _search(self, query, n_results: int, quantization: str, snapshot, rows=None):
+        """Top-k row indices and cosine similarities for a normalised query.
+
+        ``snapshot`` comes from ``_snapshot()``, so a reload by another
+        thread cannot mix generations. ``rows`` (sorted row indices)
+        restricts scoring to those rows only.
+        """
+        np = self.np
+        full_matrix, int8_codes, int8_scale, binary_codes = snapshot
+
+        def subset(codes):
+            return codes if rows is None else codes[rows]
+
+        def original(positions):
+            return positions if rows is None else rows[positions]
+
+        matrix = subset(full_matrix)
+
+        if quantization == "none":
+            # One matrix-vector product scores every chunk
+            similarities = (matrix @ query.astype(matrix.dtype)).astype(np.float32)
+            top = self._top_k(similarities, n_results)
+            return original(top), similarities[top]
+
+        if quantization == "int8":
+            # Fold the per-dimension scales into the query instead of dequantising rows
+            scaled_query = (query / int8_scale).astype(np.float32)
+            scores = self._scan(subset(int8_codes), lambda block: block.astype(np.float32) @ scaled_query)
+        else:
+            query_bits = np.packbits(query > 0)
+            # Negated Hamming distance so higher is better
+            scores = -self._scan(
+                subset(binary_codes),
+                lambda block: self._popcount[np.bitwise_xor(block, query_bits)].sum(axis=1, dtype=np.int32)
+            ).astype(np.float32)
+
+        # Re-rank the shortlist with full-precision vectors
+        shortlist = np.sort(self._top_k(scores, n_results * self.rerank_factor))
+        exact = np.asarray(matrix[shortlist], dtype=np.float32) @ query
+        order = self._top_k(exact, n_results)
+        return original(shortlist[order]), exact[order]
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """Bytes scanned per query for each representation."""
+        with self._lock:
+            self._load()
+            if self._matrix is None:
+                return {"none": 0, "int8": 0, "binary": 0}
+            return {"none": int(self._matrix.nbytes), "int8": int(self._int8.nbytes),
+                    "binary": int(self._binary.nbytes)}
+
+    def benchmark_quantization(self, sample: int = 100, k: int = 10, seed: int = 0) -> Dict[str, Any]:
+        """Compare quantized search against exact search.
+
+        Sampled stored vectors serve as queries, so no embedding backend is
+        needed. Reports recall@k against exact top-k, mean query latency and
+        the memory each representation needs.
+        """
+        with self._lock:
+            self._load()
+            snapshot = self._snapshot()
+        matrix = snapshot[0]
+        if matrix is None:
+            return {"error": "index is empty"}
+
+        np = self.np
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(matrix), size=min(sample, len(matrix)), replace=False)
+        queries = self._normalise(np.asarray(matrix[np.sort(rows)], dtype=np.float32))
+        footprint = self.memory_footprint()
+
+        report = {"queries": len(queries), "k": k, "rows": len(matrix),
+                  "rerank_factor": self.rerank_factor, "modes": {}}
+        exact_results = []
+        for mode in QUANTIZATION_MODES:
+            recalls = []
+            start = time.perf_counter()
+            for i, query in enumerate(queries):
+                top, _ = self._search(query, k, mode, snapshot)
+                if mode == "none":
+                    exact_results.append(set(top.tolist()))
+                else:
+                    recalls.append(len(exact_results[i] & set(top.tolist())) / len(exact_results[i]))
+            elapsed = time.perf_counter() - start
+
+            report["modes"][mode] = {
+                f"recall@{k}": round(sum(recalls) / len(recalls), 4) if recalls else 1.0,
+                "mean_query_ms": round(1000 * elapsed / len(queries), 3),
+                "bytes": footprint[mode],
+                "memory_saved": round(1 - footprint[mode] / footprint["none"], 4) if footprint["none"] else 0.0
+            }
+        return report
+
+    def get_documents(self, ids):
+        documents = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = list(ids[start:start + 500])
+                documents.update(self.conn.execute(
+                    f"SELECT id, document FROM rows WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return documents
+
+    def all_metadatas(self):
+        with self._lock:
+            self._load()
+            return list(self._metadatas)
+
+    def get_all(self):
+        with self._lock:
+            self._load()
+            ids, metadatas = list(self._ids), list(self._metadatas)
+            matrix = self.np.array(self._matrix, dtype=self.np.float32) if self._matrix is not None else []
+        documents = self.get_documents(ids)
+        return {"ids": ids, "embeddings": matrix, "documents": [documents.get(row_id, "") for row_id in ids],
+                "metadatas": metadatas}
+
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+REDUCTION_METHODS = ("pca", "truncate")
+
+# Metadata filters accepted by semantic_search
+FILTER_KEYS = ("directory", "modified_after", "modified_before", "filename")
+
+# Keys of a search result, for ``fields=`` projections
+SEARCH_FIELDS = (
+    "doc_id", "file_path", "filename", "directory", "similarity", "distance", "score", "fused_score", "match",
+    "heading", "matched_chunks", "preview", "snippets", "content", "stale", "metadata"
+)
+
+# "inline" stores chunk text in the index; "reference" stores only byte
+# offsets and a hash, and reads the text back from the repository
+STORAGE_MODES = ("inline", "reference")
+
+VECTOR_BACKENDS = {
+    "chroma": ChromaVectorStore,
+    "numpy": NumpyVectorStore,
+}
 
 
 class QRYDocSearch:
@@ -32,7 +1137,21 @@ class QRYDocSearch:
                  qry_repo_path: str = None,
                  chroma_db_path: str = None,
                  ollama_url: str = "http://localhost:11434",
-                 embed_model: str = "nomic-embed-text"):
+                 embed_model: str = "nomic-embed-text",
+                 batch_size: int = 16,
+                 workers: int = 1,
+                 chunk_size: int = 2000,
+                 embedding_cache_path: str = None,
+                 use_embedding_cache: bool = True,
+                 query_cache_size: int = 256,
+                 query_cache_ttl: Optional[float] = None,
+                 vector_backend: str = "chroma",
+                 vector_dtype: str = "float32",
+                 quantization: str = "none",
+                 rerank_factor: int = 10,
+                 storage_mode: str = "inline",
+                 retries: int = 3,
+                 retry_delay: float = 2.0):
         """Initialize the QRY doc search system.
 
         Args:
@@ -40,6 +1159,20 @@ class QRYDocSearch:
             chroma_db_path: Path to ChromaDB storage directory
             ollama_url: URL for Ollama API
             embed_model: Embedding model to use
+            batch_size: Documents per embedding request / ChromaDB write
+            workers: Concurrent embedding requests during ingestion
+            chunk_size: Maximum characters per embedded chunk
+            embedding_cache_path: Path to the on-disk embedding cache
+            use_embedding_cache: Consult the embedding cache before calling Ollama
+            query_cache_size: Entries kept in the in-memory query/result caches (0 disables)
+            query_cache_ttl: Optional lifetime in seconds for cached queries
+            vector_backend: "chroma" (ChromaDB) or "numpy" (memory-mapped .npy)
+            vector_dtype: Storage precision for the numpy backend ("float32" or "float16")
+            quantization: First-pass scan for the numpy backend ("none", "int8" or "binary")
+            rerank_factor: Shortlist size (x limit) re-ranked at full precision when quantized
+            storage_mode: "inline" (chunk text in the index) or "reference" (offsets into the repo files)
+            retries: Extra passes over documents that failed with a transient (network/5xx) error
+            retry_delay: Seconds before the first retry pass; doubled for each further pass
         """
         # Set up paths
         home_dir = os.path.expanduser("~")
@@ -52,18 +1185,82 @@ class QRYDocSearch:
         self.chroma_db_path = chroma_db_path or os.path.join(
             home_dir, ".local/share/qry-doc-search/chromadb"
         )
+        # Manifest of indexed files lives alongside the ChromaDB data
+        self.manifest_path = os.path.join(self.chroma_db_path, "qry_manifest.db")
+        # BM25 inverted index, also next to the ChromaDB data
+        self.lexical_index_path = os.path.join(self.chroma_db_path, "qry_lexical.db")
+        # Embedding cache is independent of the index so it survives rebuilds
+        self.embedding_cache_path = embedding_cache_path or os.path.join(
+            home_dir, ".local/share/qry-doc-search/embedding_cache.db"
+        )
+        self.use_embedding_cache = use_embedding_cache
 
         # Ollama configuration
         self.ollama_url = ollama_url
         self.embed_model = embed_model
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.chunk_size = max(200, chunk_size)
+        if storage_mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode '{storage_mode}', expected one of {STORAGE_MODES}")
+        self.storage_mode = storage_mode
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        # Flipped off if the Ollama server predates the batch /api/embed endpoint
+        self._batch_endpoint_available = True
+        self._session = None
+        # Guards lazy opening of the session and store under concurrent requests
+        self._open_lock = threading.Lock()
 
         # Set up logging
         self.logger = self._setup_logging()
 
-        # Initialize ChromaDB
-        self.chroma_client = None
-        self.collection = None
-        self._init_chromadb()
+        # Vector store; opened on first use (see the ``store`` property)
+        if vector_backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{vector_backend}', expected one of {list(VECTOR_BACKENDS)}")
+        self.vector_backend = vector_backend
+        self.vector_dtype = vector_dtype
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self._store = None
+        self._store_version = None
+        self.store_open_seconds = None
+
+        # Optional dimensionality reduction fitted by reduce_dimensions()
+        self.projection_path = os.path.join(self.chroma_db_path, "projection.npz")
+        # Written by reduce before it rewrites the store, renamed to projection_path after
+        self.pending_projection_path = os.path.join(self.chroma_db_path, "projection.pending.npz")
+        self._projection = None
+        self._projection_mtime = None
+
+        # Files that could not be embedded in the last run, with their errors
+        self.failure_report_path = os.path.join(self.chroma_db_path, "embed_failures.json")
+
+        # Initialize file manifest for incremental re-indexing
+        self.manifest_conn = None
+        self._init_manifest()
+
+        # Initialize lexical (BM25) index
+        self.lexical_index = LexicalIndex(self.lexical_index_path)
+
+        # Initialize persistent embedding cache
+        self.cache_conn = None
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        if self.use_embedding_cache:
+            self._init_embedding_cache()
+
+        # In-memory caches for repeated searches; results are tagged with the
+        # index version so any ingestion invalidates them
+        self.query_embedding_cache = LRUCache(query_cache_size, query_cache_ttl)
+        self.result_cache = LRUCache(query_cache_size, query_cache_ttl)
+
+        # Searches being computed right now, keyed like the result cache;
+        # identical concurrent searches wait for the first one (singleflight)
+        self._in_flight: Dict[tuple, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self.coalesced_searches = 0
 
     def _setup_logging(self) -> logging.Logger:
         """Set up logging configuration."""
@@ -80,37 +1277,410 @@ class QRYDocSearch:
 
         return logger
 
-    def _init_chromadb(self):
-        """Initialize ChromaDB client and collection."""
+    @property
+    def session(self) -> "requests.Session":
+        """Keep-alive HTTP session to Ollama, created on first request."""
+        if self._session is None:
+            with self._open_lock:
+                if self._session is None:
+                    self._session = self._init_session()
+        return self._session
+
+    def _init_session(self) -> "requests.Session":
+        """Create a keep-alive HTTP session sized for the embedding workers."""
+        import requests
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.workers
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @property
+    def store(self) -> VectorStore:
+        """The vector store, opened on first use.
+
+        Opening ChromaDB costs about a second of imports and client setup,
+        which --help, stats and lexical-only searches never need to pay.
+        """
+        if self._store is None:
+            with self._open_lock:
+                if self._store is None:
+                    self._init_vector_store()
+        return self._store
+
+    def _init_vector_store(self):
+        """Initialize the configured vector store backend."""
+        started = time.perf_counter()
+        self._check_vector_backend()
         try:
-            # Ensure ChromaDB directory exists
+            # Ensure index directory exists
             os.makedirs(self.chroma_db_path, exist_ok=True)
 
-            # Initialize ChromaDB client
-            self.chroma_client = chromadb.PersistentClient(
-                path=self.chroma_db_path,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
+            if self.vector_backend == "numpy":
+                store = NumpyVectorStore(self.chroma_db_path, dtype=self.vector_dtype,
+                                         quantization=self.quantization,
+                                         rerank_factor=self.rerank_factor)
+            else:
+                store = ChromaVectorStore(self.chroma_db_path)
+            self._store_version = self.get_index_version()
+            self._store = store
+            self.store_open_seconds = time.perf_counter() - started
+
+            self.logger.info(f"{self.vector_backend} vector store initialized at: {self.chroma_db_path}")
+
+        except Exception as e:
+            self.logger.error(f"Failed to initialize {self.vector_backend} vector store: {e}")
+            raise
+
+    @property
+    def chroma_client(self):
+        """ChromaDB client of the chroma backend, else None."""
+        return getattr(self.store, "client", None)
+
+    @property
+    def collection(self):
+        """ChromaDB collection of the chroma backend, else None."""
+        return getattr(self.store, "collection", None)
+
+    def _init_manifest(self):
+        """Initialize the SQLite manifest of indexed files."""
+        try:
+            # The vector store is opened lazily, so the index directory may not exist yet
+            os.makedirs(self.chroma_db_path, exist_ok=True)
+            self.manifest_conn = sqlite3.connect(self.manifest_path, check_same_thread=False)
+            with self.manifest_conn:
+                self.manifest_conn.execute("""
+                    CREATE TABLE IF NOT EXISTS files (
+                        file_path TEXT PRIMARY KEY,
+                        doc_id TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        mtime REAL NOT NULL,
+                        size INTEGER NOT NULL,
+                        indexed_at TEXT NOT NULL,
+                        directory TEXT NOT NULL DEFAULT '',
+                        chunks INTEGER
+                    )
+                """)
+                self.manifest_conn.execute("""
+                    CREATE TABLE IF NOT EXISTS meta (
+                        key TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL
+                    )
+                """)
+                self.manifest_conn.execute("""
+                    CREATE TABLE IF NOT EXISTS settings (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    )
+                """)
+
+                columns = {row[1] for row in self.manifest_conn.execute("PRAGMA table_info(files)")}
+                needs_backfill = "chunks" not in columns
+                if needs_backfill:
+                    self.manifest_conn.execute("ALTER TABLE files ADD COLUMN directory TEXT NOT NULL DEFAULT ''")
+                    self.manifest_conn.execute("ALTER TABLE files ADD COLUMN chunks INTEGER")
+                self._init_directory_stats()
+
+            if needs_backfill:
+                self._backfill_directory_stats()
+
+        except Exception as e:
+            self.logger.error(f"Failed to initialize manifest: {e}")
+            raise
+
+    def _check_vector_backend(self):
+        """Record which backend the index belongs to and refuse to open it with another.
+
+        The manifest, lexical index and projection next to the store describe
+        one backend's rows; a second backend on the same path would pair its
+        store with that bookkeeping and skip every file as already indexed.
+        Runs when the store is first opened, so commands that only read the
+        manifest (stats, lexical search) work whatever the backend.
+        """
+        row = self.manifest_conn.execute("SELECT value FROM settings WHERE key = 'vector_backend'").fetchone()
+        if row is not None:
+            backend = row[0]
+        else:
+            # Indexes from before this was recorded: go by the store files present
+            backend = self.vector_backend
+            if self.manifest_conn.execute("SELECT 1 FROM files LIMIT 1").fetchone():
+                found = {name for name, marker in (("numpy", "numpy_catalog.db"), ("numpy", "vectors_meta.json"),
+                                                   ("chroma", "chroma.sqlite3"))
+                         if os.path.exists(os.path.join(self.chroma_db_path, marker))}
+                if len(found) == 1:
+                    backend = found.pop()
+            with self.manifest_conn:
+                self.manifest_conn.execute("INSERT INTO settings VALUES ('vector_backend', ?)", (backend,))
+        if backend != self.vector_backend:
+            raise BackendMismatchError(
+                f"The index at {self.chroma_db_path} was built with the {backend} vector backend; "
+                f"pass --vector-backend {backend} or use another --chroma-db path"
             )
 
-            # Get or create collection
-            self.collection = self.chroma_client.get_or_create_collection(
-                name="qry_docs",
-                metadata={"description": "QRY documentation semantic search"}
+    def _init_directory_stats(self):
+        """Create the per-directory aggregates kept in step with ``files``.
+
+        Triggers apply each manifest change as a delta, so ``get_stats``
+        reads a handful of rows however large the collection grows.
+        """
+        self.manifest_conn.execute("""
+            CREATE TABLE IF NOT EXISTS directory_stats (
+                directory TEXT PRIMARY KEY,
+                documents INTEGER NOT NULL DEFAULT 0,
+                chunks INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                last_indexed_at TEXT
+            )
+        """)
+        add = """
+            INSERT INTO directory_stats (directory) VALUES (NEW.directory) ON CONFLICT DO NOTHING;
+            UPDATE directory_stats SET
+                documents = documents + (COALESCE(NEW.chunks, 0) > 0),
+                chunks = chunks + COALESCE(NEW.chunks, 0),
+                bytes = bytes + NEW.size,
+                last_indexed_at = MAX(COALESCE(last_indexed_at, ''), NEW.indexed_at)
+            WHERE directory = NEW.directory;
+        """
+        remove = """
+            UPDATE directory_stats SET
+                documents = documents - (COALESCE(OLD.chunks, 0) > 0),
+                chunks = chunks - COALESCE(OLD.chunks, 0),
+                bytes = bytes - OLD.size
+            WHERE directory = OLD.directory;
+        """
+        self.manifest_conn.execute(f"CREATE TRIGGER IF NOT EXISTS files_insert AFTER INSERT ON files BEGIN {add} END")
+        self.manifest_conn.execute(f"CREATE TRIGGER IF NOT EXISTS files_update AFTER UPDATE ON files BEGIN {remove} {add} END")
+        self.manifest_conn.execute(f"CREATE TRIGGER IF NOT EXISTS files_delete AFTER DELETE ON files BEGIN {remove} END")
+
+    def _backfill_directory_stats(self):
+        """One-off fill of directory/chunk columns for manifests that predate them."""
+        self.logger.info("Backfilling collection statistics from the vector store")
+        chunks = Counter()
+        directories = {}
+        for metadata in self.store.all_metadatas():
+            chunks[metadata.get("doc_id")] += 1
+            directories[metadata.get("doc_id")] = metadata.get("directory", "")
+        with self.manifest_conn:
+            self.manifest_conn.executemany(
+                "UPDATE files SET directory = ?, chunks = ? WHERE doc_id = ?",
+                [(directories[doc_id], count, doc_id) for doc_id, count in chunks.items()]
+            )
+            # Rebuild from scratch; the triggers only apply deltas from here on
+            self.manifest_conn.execute("DELETE FROM directory_stats")
+            self.manifest_conn.execute("""
+                INSERT INTO directory_stats
+                SELECT directory, SUM(COALESCE(chunks, 0) > 0), SUM(COALESCE(chunks, 0)),
+                       SUM(size), MAX(indexed_at)
+                FROM files GROUP BY directory
+            """)
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Load the manifest as a mapping of file_path -> record."""
+        rows = self.manifest_conn.execute(
+            "SELECT file_path, doc_id, content_hash, mtime, size FROM files"
+        ).fetchall()
+        return {
+            row[0]: {"doc_id": row[1], "content_hash": row[2], "mtime": row[3], "size": row[4]}
+            for row in rows
+        }
+
+    def _record_manifest(self, documents: List[Dict[str, Any]]):
+        """Record indexed documents in the manifest (one transaction).
+
+        Documents without a ``chunks`` count (touched but unchanged files)
+        keep the count already on record.
+        """
+        indexed_at = datetime.now().isoformat()
+        with self.manifest_conn:
+            self.manifest_conn.executemany(
+                """
+                INSERT INTO files (file_path, doc_id, content_hash, mtime, size, indexed_at, directory, chunks)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(file_path) DO UPDATE SET
+                    doc_id = excluded.doc_id,
+                    content_hash = excluded.content_hash,
+                    mtime = excluded.mtime,
+                    size = excluded.size,
+                    indexed_at = excluded.indexed_at,
+                    directory = excluded.directory,
+                    chunks = COALESCE(excluded.chunks, files.chunks)
+                """,
+                [(doc_info['file_path'], doc_info['doc_id'], doc_info['content_hash'],
+                  doc_info['mtime'], doc_info['bytes'], indexed_at,
+                  doc_info['directory'], doc_info.get('chunks'))
+                 for doc_info in documents]
+            )
+
+    def _forget_manifest(self, file_paths: List[str]):
+        """Remove documents from the manifest."""
+        with self.manifest_conn:
+            self.manifest_conn.executemany(
+                "DELETE FROM files WHERE file_path = ?",
+                [(file_path,) for file_path in file_paths]
             )
 
-            self.logger.info(f"ChromaDB initialized at: {self.chroma_db_path}")
+    def get_index_version(self) -> int:
+        """Current index version; bumped by every write to the collection.
+
+        Stored in the manifest database so writers in other processes
+        (``embed``, ``watch``) invalidate this process's result cache too.
+        """
+        row = self.manifest_conn.execute(
+            "SELECT value FROM meta WHERE key = 'index_version'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_index_updated_at(self) -> Optional[int]:
+        """Unix time of the last index write, or None if not recorded yet."""
+        row = self.manifest_conn.execute(
+            "SELECT value FROM meta WHERE key = 'index_updated_at'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def refresh(self):
+        """Reopen the vector store if another process has written to the index.
+
+        Long-lived searchers (the socket daemon, web workers) call this
+        before each request; the result cache is already keyed by index
+        version. Concurrent callers reopen the store only once.
+        """
+        index_version = self.get_index_version()
+        if self._store is not None and index_version != self._store_version:
+            with self._open_lock:
+                if index_version != self._store_version:
+                    self._store.reopen()
+                    self._store_version = index_version
+
+    def _bump_index_version(self):
+        """Mark the index as changed."""
+        with self.manifest_conn:
+            self.manifest_conn.execute(
+                "INSERT INTO meta VALUES ('index_version', 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+            )
+            self.manifest_conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('index_updated_at', ?)",
+                (int(time.time()),)
+            )
+
+    def _delete_documents(self, doc_ids: List[str]):
+        """Delete every chunk belonging to the given documents."""
+        if doc_ids:
+            self.store.delete_documents(doc_ids)
+            self.lexical_index.delete_documents(doc_ids)
+            self._bump_index_version()
+
+    def _clear_collection(self):
+        """Delete every embedding in the collection and clear the manifest."""
+        # Open the store up front: a backend mismatch must fail before the manifest is wiped
+        store = self.store
+        # Manifest first: if we die in between, a resumed run re-embeds
+        # everything rather than trusting entries whose vectors are gone
+        with self.manifest_conn:
+            self.manifest_conn.execute("DELETE FROM files")
+            self.manifest_conn.execute("DELETE FROM directory_stats")
+        store.clear()
+        self.lexical_index.clear()
+        # A rebuilt index starts again at the model's full dimension
+        for path in (self.projection_path, self.pending_projection_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._bump_index_version()
+
+    def _init_embedding_cache(self):
+        """Initialize the SQLite embedding cache keyed by (model, normalized, sha256(text)).
+
+        ``/api/embed`` returns unit-length vectors and ``/api/embeddings``
+        raw ones, so the two are cached apart.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.embedding_cache_path), exist_ok=True)
+            self.cache_conn = sqlite3.connect(self.embedding_cache_path, check_same_thread=False)
+            with self.cache_conn:
+                # Rows from before the split could have come from either endpoint
+                self.cache_conn.execute("DROP TABLE IF EXISTS embeddings")
+                self.cache_conn.execute("""
+                    CREATE TABLE IF NOT EXISTS vectors (
+                        model TEXT NOT NULL,
+                        normalized INTEGER NOT NULL,
+                        text_hash TEXT NOT NULL,
+                        vector BLOB NOT NULL,
+                        PRIMARY KEY (model, normalized, text_hash)
+                    ) WITHOUT ROWID
+                """)
 
         except Exception as e:
-            self.logger.error(f"Failed to initialize ChromaDB: {e}")
-            raise
+            # The cache is an optimisation; run without it rather than fail
+            self.logger.warning(f"Embedding cache unavailable, continuing without it: {e}")
+            self.cache_conn = None
+
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        """Cache key for a piece of text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _cache_lookup(self, hashes: List[str], normalized: bool) -> Dict[str, List[float]]:
+        """Fetch cached embeddings of one kind (batch-normalized or raw) for the given text hashes."""
+        if self.cache_conn is None or not hashes:
+            return {}
+
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._cache_lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.cache_conn.execute(
+                    f"SELECT text_hash, vector FROM vectors "
+                    f"WHERE model = ? AND normalized = ? AND text_hash IN ({placeholders})",
+                    [self.embed_model, int(normalized), *chunk]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[text_hash] = vector.tolist()
+        return found
+
+    def _cache_store(self, hashes: List[str], embeddings: List[List[float]], normalized: bool):
+        """Store embeddings of one kind as float32 blobs."""
+        if self.cache_conn is None or not hashes:
+            return
+
+        with self._cache_lock, self.cache_conn:
+            self.cache_conn.executemany(
+                "INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?)",
+                [(self.embed_model, int(normalized), text_hash, array('f', embedding).tobytes())
+                 for text_hash, embedding in zip(hashes, embeddings)]
+            )
 
     def get_ollama_embedding(self, text: str) -> List[float]:
-        """Get embedding for text using Ollama."""
+        """Get embedding for text using Ollama, consulting the embedding cache first."""
+        text_hash = self._text_hash(text)
+        # Always /api/embeddings, so raw vectors
+        cached = self._cache_lookup([text_hash], normalized=False)
+        with self._cache_lock:
+            if cached:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if cached:
+            return cached[text_hash]
+
+        embedding = self._request_embedding(text)
+        self._cache_store([text_hash], [embedding], normalized=False)
+        return embedding
+
+    def _request_embedding(self, text: str) -> List[float]:
+        """Request a single embedding from Ollama's /api/embeddings endpoint."""
+        import requests
+
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.ollama_url}/api/embeddings",
                 json={
                     "model": self.embed_model,
@@ -131,203 +1701,1185 @@ class QRYDocSearch:
             self.logger.error(f"Unexpected Ollama API response format: {e}")
             raise
 
-    def find_markdown_files(self) -> List[Dict[str, Any]]:
-        """Find all markdown files in the QRY repository."""
-        markdown_files = []
+    def get_ollama_embeddings(self, texts: List[str], persist: bool = True) -> List[List[float]]:
+        """Get embeddings for several texts in a single Ollama request.
 
+        Cached embeddings are served from disk; only cache misses are sent
+        to Ollama. With ``persist`` false (search queries, which are user
+        input) fresh vectors are not written to the disk cache.
+        """
+        if not texts:
+            return []
+
+        hashes = [self._text_hash(text) for text in texts]
+        # Normalized vectors while the batch endpoint serves the requests
+        cached = self._cache_lookup(hashes, normalized=self._batch_endpoint_available)
+        missing = [i for i, text_hash in enumerate(hashes) if text_hash not in cached]
+        with self._cache_lock:
+            self.cache_hits += len(texts) - len(missing)
+            self.cache_misses += len(missing)
+
+        if missing:
+            fresh = self._request_embeddings([texts[i] for i in missing])
+            if persist:
+                # Checked again: the request may have found /api/embed missing
+                self._cache_store([hashes[i] for i in missing], fresh, normalized=self._batch_endpoint_available)
+            for i, embedding in zip(missing, fresh):
+                cached[hashes[i]] = embedding
+
+        return [cached[text_hash] for text_hash in hashes]
+
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Request embeddings for several texts from Ollama.
+
+        Uses the batch /api/embed endpoint; falls back to one
+        /api/embeddings request per text on older Ollama servers.
+        """
+        import requests
+
+        if self._batch_endpoint_available:
+            try:
+                response = self.session.post(
+                    f"{self.ollama_url}/api/embed",
+                    json={
+                        "model": self.embed_model,
+                        "input": texts
+                    },
+                    timeout=30 + 10 * len(texts)
+                )
+                if response.status_code == 404:
+                    self.logger.warning("Ollama batch endpoint /api/embed not available, falling back to /api/embeddings")
+                    self._batch_endpoint_available = False
+                else:
+                    response.raise_for_status()
+                    embeddings = response.json()["embeddings"]
+
+                    self.logger.debug(f"Generated {len(embeddings)} embeddings in one request")
+                    return embeddings
+
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Ollama API request failed: {e}")
+                raise
+            except KeyError as e:
+                self.logger.error(f"Unexpected Ollama API response format: {e}")
+                raise
+
+        return [self._request_embedding(text) for text in texts]
+
+    def iter_markdown_files(self) -> Iterator[Dict[str, Any]]:
+        """Walk the QRY repository, yielding lightweight file descriptors.
+
+        Descriptors carry path and stat information only; content is read
+        later by ``load_document`` so discovery runs in constant memory.
+        """
         # Walk through the repository
         for root, dirs, files in os.walk(self.qry_repo_path):
             # Skip hidden directories and common build/cache directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__', 'venv', '.git']]
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in EXCLUDED_DIRS]
 
             for file in files:
                 if file.endswith('.md'):
-                    file_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(file_path, self.qry_repo_path)
+                    doc_info = self._describe_file(os.path.join(root, file))
+                    if doc_info is not None:
+                        yield doc_info
 
-                    try:
-                        # Get file stats
-                        stat = os.stat(file_path)
-                        modified_time = datetime.fromtimestamp(stat.st_mtime)
-
-                        # Read file content
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-
-                        # Create document info
-                        doc_info = {
-                            'file_path': relative_path,
-                            'full_path': file_path,
-                            'content': content,
-                            'size': len(content),
-                            'modified': modified_time.isoformat(),
-                            'directory': os.path.dirname(relative_path),
-                            'filename': file,
-                            'doc_id': hashlib.md5(relative_path.encode()).hexdigest()
-                        }
+    def _describe_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Build a descriptor (path and stat info, no content) for one file."""
+        relative_path = os.path.relpath(file_path, self.qry_repo_path)
+
+        try:
+            # Get file stats
+            stat = os.stat(file_path)
+            modified_time = datetime.fromtimestamp(stat.st_mtime)
+        except OSError as e:
+            self.logger.warning(f"Failed to process {relative_path}: {e}")
+            return None
+
+        return {
+            'file_path': relative_path,
+            'full_path': file_path,
+            'bytes': stat.st_size,
+            'mtime': stat.st_mtime,
+            'modified': modified_time.isoformat(),
+            'directory': os.path.dirname(relative_path),
+            'filename': os.path.basename(file_path),
+            'doc_id': hashlib.md5(relative_path.encode()).hexdigest()
+        }
 
-                        markdown_files.append(doc_info)
+    def _is_indexable(self, file_path: str) -> bool:
+        """Whether a path would be picked up by ``iter_markdown_files``."""
+        relative_path = os.path.relpath(os.path.abspath(file_path), os.path.abspath(self.qry_repo_path))
+        parts = relative_path.split(os.sep)
+        if not relative_path.endswith('.md') or parts[0] == os.pardir:
+            return False
+        return not any(part.startswith('.') or part in EXCLUDED_DIRS for part in parts[:-1])
 
-                    except Exception as e:
-                        self.logger.warning(f"Failed to process {relative_path}: {e}")
-                        continue
+    def load_document(self, doc_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Read a descriptor's content in place; returns None if unreadable."""
+        if 'content' in doc_info:
+            return doc_info
+
+        try:
+            with open(doc_info['full_path'], 'rb') as f:
+                raw = f.read()
+        except Exception as e:
+            self.logger.warning(f"Failed to process {doc_info['file_path']}: {e}")
+            return None
+        content = decode_text(raw)
+        if self.storage_mode == "reference":
+            # Byte offsets are taken from the file as stored, CRLFs and all
+            doc_info['raw'] = raw
+
+        doc_info.update({
+            'content': content,
+            'size': len(content),
+            'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest()
+        })
+        return doc_info
+
+    def find_markdown_files(self) -> List[Dict[str, Any]]:
+        """Find all markdown files in the QRY repository, with content loaded."""
+        markdown_files = [doc_info for doc_info in self.iter_markdown_files()
+                          if self.load_document(doc_info) is not None]
 
         self.logger.info(f"Found {len(markdown_files)} markdown files")
         return markdown_files
 
+    def _doc_metadata(self, doc_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the ChromaDB metadata record for a document."""
+        return {
+            'doc_id': doc_info['doc_id'],
+            'file_path': doc_info['file_path'],
+            'directory': doc_info['directory'],
+            'filename': doc_info['filename'],
+            'size': doc_info['size'],
+            'modified': doc_info['modified'],
+            'content_hash': doc_info['content_hash']
+        }
+
+    def _chunk_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Split a batch of documents into chunk records ready for ChromaDB."""
+        records = []
+        for doc_info in batch:
+            if self.storage_mode == "reference":
+                # Chunk the undecoded file (surrogateescape round-trips every byte),
+                # so offsets index the bytes _chunk_text will seek into
+                content = doc_info['raw'].decode('utf-8', errors='surrogateescape')
+            else:
+                content = doc_info['content']
+            chunks = chunk_markdown(content, self.chunk_size)
+            char_pos = byte_pos = 0
+            for index, chunk in enumerate(chunks):
+                text = chunk['text']
+                metadata = self._doc_metadata(doc_info)
+                metadata.update({
+                    'chunk_index': index,
+                    'chunk_count': len(chunks),
+                    'heading': chunk['heading']
+                })
+                if self.storage_mode == "reference":
+                    # Chunks are contiguous slices of the file, so track byte offsets as we go
+                    start = content.find(text, char_pos)
+                    byte_pos += len(content[char_pos:start].encode('utf-8', errors='surrogateescape'))
+                    raw_chunk = text.encode('utf-8', errors='surrogateescape')
+                    byte_end = byte_pos + len(raw_chunk)
+                    char_pos, byte_pos = start + len(text), byte_end
+                    # Embed and hash the text as _chunk_text will decode it
+                    text = decode_text(raw_chunk)
+                    metadata.update({
+                        'byte_start': byte_end - len(raw_chunk),
+                        'byte_end': byte_end,
+                        'chunk_hash': self._text_hash(text)[:16]
+                    })
+                records.append({
+                    'id': f"{doc_info['doc_id']}:{index}",
+                    'text': text,
+                    'metadata': metadata
+                })
+        return records
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in requests of at most ``batch_size`` inputs."""
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self.get_ollama_embeddings(texts[start:start + self.batch_size]))
+        return embeddings
+
     def embed_document(self, doc_info: Dict[str, Any]) -> bool:
         """Embed a single document."""
-        try:
-            doc_id = doc_info['doc_id']
-            content = doc_info['content']
-
-            # Skip empty files
-            if not content.strip():
+        return self.embed_batch([doc_info]) == 1
+
+    def _non_empty(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop empty files from a batch."""
+        batch = []
+        for doc_info in documents:
+            if doc_info['content'].strip():
+                batch.append(doc_info)
+            else:
                 self.logger.debug(f"Skipping empty file: {doc_info['file_path']}")
-                return False
+        return batch
+
+    def _store_batch(self, batch: List[Dict[str, Any]], records: List[Dict[str, Any]],
+                     embeddings: List[List[float]]) -> int:
+        """Write an embedded batch of chunks to the vector store and the manifest."""
+        # Previous chunks go in the same write: a changed document may now have fewer of them
+        doc_ids = [doc_info['doc_id'] for doc_info in batch]
+        self.store.replace_documents(
+            doc_ids,
+            embeddings=self._project(embeddings),
+            # Reference rows keep no text; it is read back from the repository
+            documents=[record['text'] if self.storage_mode == "inline" else "" for record in records],
+            ids=[record['id'] for record in records],
+            metadatas=[record['metadata'] for record in records]
+        )
+        self.lexical_index.delete_documents(doc_ids)
+        self.lexical_index.add(records)
+        chunk_counts = Counter(record['metadata']['doc_id'] for record in records)
+        for doc_info in batch:
+            doc_info['chunks'] = chunk_counts[doc_info['doc_id']]
+        self._record_manifest(batch)
+        self._bump_index_version()
+
+        self.logger.debug(f"Embedded batch of {len(batch)} documents")
+        return len(batch)
+
+    def _retry_individually(self, batch: List[Dict[str, Any]], error: Exception,
+                            failures: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """Fall back to one-at-a-time embedding after a batch failure.
+
+        Documents that still fail are recorded in ``failures`` (keyed by
+        file path) when given, for the retry queue and the failure report.
+        """
+        if len(batch) == 1:
+            doc_info = batch[0]
+            self.logger.error(f"Failed to embed {doc_info.get('file_path', 'unknown')}: {error}")
+            if failures is not None:
+                previous = failures.get(doc_info['file_path'], {})
+                failures[doc_info['file_path']] = {
+                    'doc_info': doc_info,
+                    'error': str(error),
+                    'transient': self._is_transient(error),
+                    'attempts': previous.get('attempts', 0) + 1
+                }
+            return 0
 
-            # Generate embedding
-            embedding = self.get_ollama_embedding(content)
+        self.logger.warning(f"Batch embedding failed ({error}), retrying documents individually")
+        return sum(self.embed_batch([doc_info], failures) for doc_info in batch)
 
-            # Prepare metadata
-            metadata = {
-                'file_path': doc_info['file_path'],
-                'directory': doc_info['directory'],
-                'filename': doc_info['filename'],
-                'size': doc_info['size'],
-                'modified': doc_info['modified']
-            }
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Whether an embedding failure is worth retrying (Ollama down, slow or overloaded)."""
+        import requests
+
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return error.response.status_code == 429 or error.response.status_code >= 500
+        return False
 
-            # Add to ChromaDB
-            self.collection.add(
-                embeddings=[embedding],
-                documents=[content],
-                ids=[doc_id],
-                metadatas=[metadata]
+    def _retry_failures(self, failures: Dict[str, Dict[str, Any]]) -> int:
+        """Re-embed transiently failed documents, backing off between passes.
+
+        Returns:
+            Number of documents embedded on retry
+        """
+        embedded = 0
+        for attempt in range(self.retries):
+            queue = [failure['doc_info'] for failure in failures.values() if failure['transient']]
+            if not queue:
+                break
+            delay = self.retry_delay * 2 ** attempt
+            self.logger.warning(
+                f"Retrying {len(queue)} failed documents in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{self.retries})"
             )
+            time.sleep(delay)
+            for doc_info in queue:
+                if self.embed_batch([doc_info], failures):
+                    del failures[doc_info['file_path']]
+                    embedded += 1
+        return embedded
+
+    def _write_failure_report(self, failures: Dict[str, Dict[str, Any]]) -> Optional[str]:
+        """Write the per-file failure report; remove a stale one after a clean run."""
+        if not failures:
+            if os.path.exists(self.failure_report_path):
+                os.remove(self.failure_report_path)
+            return None
+
+        report = {
+            "generated_at": datetime.now().isoformat(),
+            "failed": len(failures),
+            "files": [
+                {
+                    "file_path": file_path,
+                    "error": failure['error'],
+                    "transient": failure['transient'],
+                    "attempts": failure['attempts']
+                }
+                for file_path, failure in sorted(failures.items())
+            ]
+        }
+        with open(self.failure_report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.logger.warning(f"{len(failures)} files failed to embed, see {self.failure_report_path}")
+        return self.failure_report_path
 
-            self.logger.debug(f"Embedded: {doc_info['file_path']}")
-            return True
+    def embed_batch(self, documents: List[Dict[str, Any]],
+                    failures: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """Embed a batch of documents with one embedding request and one ChromaDB write.
+
+        If the batch request fails, documents are retried one at a time so a
+        single bad file does not sink its neighbours.
+
+        Returns:
+            Number of documents embedded
+        """
+        batch = self._non_empty(documents)
+        if not batch:
+            return 0
 
+        try:
+            records = self._chunk_batch(batch)
+            embeddings = self._embed_texts([record['text'] for record in records])
+            return self._store_batch(batch, records, embeddings)
         except Exception as e:
-            self.logger.error(f"Failed to embed {doc_info.get('file_path', 'unknown')}: {e}")
-            return False
+            return self._retry_individually(batch, e, failures)
+
+    def _embed_in_batches(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Embed documents in batches of ``batch_size`` and report throughput.
+
+        ``documents`` is consumed lazily: this thread discovers, reads and
+        chunks the next batches while embedding requests run on a bounded
+        thread pool sharing the pooled HTTP session. This thread also stays
+        the single writer for ChromaDB and the manifest, so at most
+        ``2 * workers`` batches are held in memory at once.
+
+        Every batch is committed to the index and the manifest as soon as it
+        is written, so an interrupted run loses at most the batches in
+        flight and the next ``embed`` picks up where it stopped. Documents
+        that failed transiently are retried with backoff at the end, and
+        whatever still fails is written to the failure report.
+        """
+        failures = {}
+        success_count = 0
+        skipped_count = 0
+        done_count = 0
+        start_time = time.monotonic()
+        hits_before = self.cache_hits
+        pending = iter(documents)
+
+        def report(batch):
+            elapsed = time.monotonic() - start_time
+            rate = success_count / elapsed if elapsed > 0 else 0.0
+            self.logger.info(
+                f"Embedded {success_count}/{done_count} "
+                f"({rate:.1f} docs/sec): {batch[-1]['file_path']}"
+            )
 
-    def embed_all_documents(self, force_rebuild: bool = False) -> Dict[str, Any]:
-        """Embed all markdown documents in the repository."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Keep a bounded number of batches in flight; write them back in order
+            in_flight = deque()
+
+            def submit_next() -> bool:
+                raw_batch = list(islice(pending, self.batch_size))
+                if not raw_batch:
+                    return False
+                loaded = []
+                for doc_info in raw_batch:
+                    if self.load_document(doc_info) is not None:
+                        loaded.append(doc_info)
+                    else:
+                        failures[doc_info['file_path']] = {
+                            'doc_info': doc_info, 'error': "could not read file",
+                            'transient': False, 'attempts': 1
+                        }
+                batch = self._non_empty(loaded)
+                records = self._chunk_batch(batch)
+                future = None
+                if records:
+                    texts = [record['text'] for record in records]
+                    future = executor.submit(self._embed_texts, texts)
+                in_flight.append((raw_batch, loaded, batch, records, future))
+                return True
+
+            for _ in range(self.workers * 2):
+                if not submit_next():
+                    break
+
+            while in_flight:
+                raw_batch, loaded, batch, records, future = in_flight.popleft()
+
+                # Remember empty files so incremental runs don't keep revisiting them
+                empty = [doc_info for doc_info in loaded if not doc_info['content'].strip()]
+                if empty:
+                    # A file emptied since the last run must lose its old chunks
+                    self._delete_documents([doc_info['doc_id'] for doc_info in empty])
+                    for doc_info in empty:
+                        doc_info['chunks'] = 0
+                    self._record_manifest(empty)
+                    skipped_count += len(empty)
+
+                if future is not None:
+                    try:
+                        success_count += self._store_batch(batch, records, future.result())
+                    except Exception as e:
+                        success_count += self._retry_individually(batch, e, failures)
+
+                done_count += len(raw_batch)
+                report(raw_batch)
+                submit_next()
+
+        success_count += self._retry_failures(failures)
+        report_path = self._write_failure_report(failures)
+        # Merge the segments this run appended (the numpy backend), if enough piled up
+        if self._store is not None:
+            self._store.compact()
+
+        elapsed = time.monotonic() - start_time
+        return {
+            "total": done_count,
+            "embedded": success_count,
+            "skipped": skipped_count,
+            "failed": done_count - success_count - skipped_count,
+            "elapsed_seconds": round(elapsed, 3),
+            "docs_per_sec": round(success_count / elapsed, 2) if elapsed > 0 else 0.0,
+            "cached_embeddings": self.cache_hits - hits_before,
+            "failure_report": report_path
+        }
+
+    def embed_all_documents(self, force_rebuild: bool = False, incremental: bool = False) -> Dict[str, Any]:
+        """Embed all markdown documents in the repository.
+
+        Without ``force_rebuild`` an existing index is resumed rather than
+        rebuilt: progress is committed batch by batch, so only files missing
+        from the manifest (or changed since) are embedded.
+
+        Args:
+            force_rebuild: Clear the collection and re-embed every document
+            incremental: Only re-embed added/changed documents and drop removed ones
+        """
         try:
-            # Check if we need to rebuild
-            collection_count = self.collection.count()
+            if incremental and not force_rebuild:
+                return self.embed_changed_documents()
+
+            collection_count = self.store.count()
             if collection_count > 0 and not force_rebuild:
-                self.logger.info(f"Collection already has {collection_count} documents. Use force_rebuild=True to rebuild.")
-                return {"status": "skipped", "count": collection_count}
+                self.logger.info(
+                    f"Collection already has {collection_count} chunks; resuming with files "
+                    f"not yet embedded or changed since (use force_rebuild=True to start over)"
+                )
+                return self.embed_changed_documents()
 
             if force_rebuild and collection_count > 0:
                 self.logger.info("Force rebuild requested, clearing existing collection...")
-                self.collection.delete(where={})
+                self._clear_collection()
 
-            # Find all markdown files
-            documents = self.find_markdown_files()
+            # Stream markdown files straight into the embedding pipeline
+            progress = self._embed_in_batches(self.iter_markdown_files())
+            total_files = progress["total"]
+            success_count = progress["embedded"]
 
-            if not documents:
+            if not total_files:
                 self.logger.warning("No markdown files found!")
                 return {"status": "no_files", "count": 0}
 
-            # Embed documents
-            success_count = 0
-            failed_count = 0
+            result = {
+                "status": "completed",
+                "total_files": total_files,
+                "embedded": success_count,
+                "skipped": progress["skipped"],
+                "failed": progress["failed"],
+                "success_rate": success_count / total_files,
+                "elapsed_seconds": progress["elapsed_seconds"],
+                "docs_per_sec": progress["docs_per_sec"],
+                "cached_embeddings": progress["cached_embeddings"],
+                "failure_report": progress["failure_report"]
+            }
 
-            for i, doc_info in enumerate(documents, 1):
-                self.logger.info(f"Embedding {i}/{len(documents)}: {doc_info['file_path']}")
+            self.logger.info(f"Embedding complete: {success_count}/{total_files} files embedded")
+            return result
 
-                if self.embed_document(doc_info):
-                    success_count += 1
-                else:
-                    failed_count += 1
+        except Exception as e:
+            self.logger.error(f"Failed to embed documents: {e}")
+            raise
+
+    def embed_changed_documents(self) -> Dict[str, Any]:
+        """Incrementally re-index using the file manifest.
+
+        Files whose mtime and size match the manifest are skipped without
+        hashing; otherwise the content hash decides whether to re-embed.
+        Vectors for files no longer on disk are deleted.
+        """
+        try:
+            manifest = self._load_manifest()
+            seen_paths = set()
+            counts = {"total": 0, "unchanged": 0}
+
+            def changed_documents():
+                for doc_info in self.iter_markdown_files():
+                    counts["total"] += 1
+                    seen_paths.add(doc_info['file_path'])
+                    entry = manifest.get(doc_info['file_path'])
+
+                    if entry is not None:
+                        if entry['mtime'] == doc_info['mtime'] and entry['size'] == doc_info['bytes']:
+                            counts["unchanged"] += 1
+                            continue
+                        if (self.load_document(doc_info) is not None
+                                and entry['content_hash'] == doc_info['content_hash']):
+                            # Touched but identical content - just refresh the manifest
+                            self._record_manifest([doc_info])
+                            counts["unchanged"] += 1
+                            continue
+
+                    yield doc_info
+
+            progress = self._embed_in_batches(changed_documents())
+            success_count = progress["embedded"]
+            unchanged_count = counts["unchanged"]
+
+            # Drop vectors for files that disappeared from the repository
+            removed_paths = [path for path in manifest if path not in seen_paths]
+            if removed_paths:
+                self._delete_documents([manifest[path]['doc_id'] for path in removed_paths])
+                self._forget_manifest(removed_paths)
+                for path in removed_paths:
+                    self.logger.info(f"Removed: {path}")
 
             result = {
                 "status": "completed",
-                "total_files": len(documents),
+                "mode": "incremental",
+                "total_files": counts["total"],
+                "unchanged": unchanged_count,
                 "embedded": success_count,
-                "failed": failed_count,
-                "success_rate": success_count / len(documents) if documents else 0
+                "skipped": progress["skipped"],
+                "failed": progress["failed"],
+                "removed": len(removed_paths),
+                "elapsed_seconds": progress["elapsed_seconds"],
+                "docs_per_sec": progress["docs_per_sec"],
+                "cached_embeddings": progress["cached_embeddings"],
+                "failure_report": progress["failure_report"]
             }
 
-            self.logger.info(f"Embedding complete: {success_count}/{len(documents)} files embedded")
+            self.logger.info(
+                f"Incremental index complete: {success_count} embedded, "
+                f"{unchanged_count} unchanged, {len(removed_paths)} removed"
+            )
             return result
 
         except Exception as e:
-            self.logger.error(f"Failed to embed documents: {e}")
+            self.logger.error(f"Failed to incrementally embed documents: {e}")
             raise
 
-    def semantic_search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def _read_document(self, file_path: str) -> Optional[str]:
+        """Read a document's current content from the repository."""
+        try:
+            with open(os.path.join(self.qry_repo_path, file_path), 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _chunk_text(self, metadata: Dict[str, Any], document: str) -> Optional[str]:
+        """Text of a chunk hit; None if a by-reference chunk changed on disk since indexing."""
+        if 'byte_start' not in metadata:
+            return document
+        try:
+            with open(os.path.join(self.qry_repo_path, metadata['file_path']), 'rb') as f:
+                f.seek(metadata['byte_start'])
+                text = decode_text(f.read(metadata['byte_end'] - metadata['byte_start']))
+        except OSError:
+            return None
+        if self._text_hash(text)[:16] != metadata['chunk_hash']:
+            return None
+        return text
+
+    def load_content(self, result: Dict[str, Any]) -> Optional[str]:
+        """Full text of a search result's document.
+
+        Inline results already carry it; by-reference results read the file
+        on demand and are marked ``stale`` if it changed since indexing.
+        """
+        if result.get("content") is not None:
+            return result["content"]
+        content = self._read_document(result["file_path"])
+        expected = result.get("metadata", {}).get("content_hash")
+        if content is None or (expected and hashlib.sha256(content.encode('utf-8')).hexdigest() != expected):
+            result["stale"] = True
+        return content
+
+    def semantic_search(self, query: str, limit: int = 10, mode: str = "semantic",
+                        fields: Optional[Iterable[str]] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Perform semantic search across embedded documents.
 
+        Chunk hits are aggregated per parent document; a document is ranked by
+        its best-matching chunk. If the embedding backend fails, semantic and
+        hybrid searches fall back to the lexical index.
+
         Args:
             query: Search query
             limit: Maximum number of results to return
+            mode: "semantic" (vectors), "lexical" (BM25) or "hybrid" (rank fusion of both)
+            fields: Result keys to return (see SEARCH_FIELDS); None returns all.
+                Full file content is only read when "content" is requested.
+            filters: Metadata restrictions applied inside the index before top-k:
+                "directory" (path prefix, or a list of them), "modified_after" /
+                "modified_before" (ISO date/datetime or epoch seconds; after is
+                inclusive, before exclusive) and "filename" (glob, e.g. "*_plan.md")
 
         Returns:
             List of search results with similarity scores
         """
-        try:
-            # Get embedding for query
-            query_embedding = self.get_ollama_embedding(query)
-
-            # Search in ChromaDB
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=limit,
-                include=["documents", "metadatas", "distances"]
-            )
+        return self.semantic_search_many([query], limit=limit, mode=mode, fields=fields, filters=filters)[0]
 
-            # Format results
-            search_results = []
-            for i in range(len(results["ids"][0])):
-                # Get content preview (first 200 chars)
-                content = results["documents"][0][i]
-                preview = content[:200] + "..." if len(content) > 200 else content
-
-                result = {
-                    "doc_id": results["ids"][0][i],
-                    "file_path": results["metadatas"][0][i]["file_path"],
-                    "filename": results["metadatas"][0][i]["filename"],
-                    "directory": results["metadatas"][0][i]["directory"],
-                    "similarity": 1 - results["distances"][0][i],  # Convert distance to similarity
-                    "distance": results["distances"][0][i],
-                    "preview": preview,
-                    "content": content,
-                    "metadata": results["metadatas"][0][i]
-                }
-                search_results.append(result)
+    def iter_search(self, query: str, limit: int = 10, mode: str = "semantic",
+                    fields: Optional[Iterable[str]] = None,
+                    filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """``semantic_search`` that formats each result only when it is consumed.
+
+        The index search runs (and bad arguments raise) when this is called;
+        snippets and file content are then produced hit by hit, so a caller
+        streaming results can send the first one before the last is built.
+        """
+        fields = self._check_search_args(mode, fields)
+        results = self._search_with_cache([query], limit, mode, filters)[query]
+        return (self._project_result(result, fields) for result in results)
 
-            self.logger.info(f"Found {len(search_results)} results for query: '{query}'")
-            return search_results
+    def semantic_search_many(self, queries: Iterable[str], limit: int = 10, mode: str = "semantic",
+                             fields: Optional[Iterable[str]] = None,
+                             filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Run several searches in one pass.
+
+        Queries not in the result cache are embedded in one batch request and
+        looked up with a single multi-vector index query. A query that another
+        thread is already searching with the same limit, mode and filters is
+        not searched again; this call waits for and shares that result.
+        Arguments are as for ``semantic_search``, applied to every query.
+
+        Returns:
+            One result list per query, in input order
+        """
+        fields = self._check_search_args(mode, fields)
+        queries = list(queries)
+        found = self._search_with_cache(queries, limit, mode, filters)
+        return [self._project_results(found[query], fields) for query in queries]
+
+    @staticmethod
+    def _check_search_args(mode: str, fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+        """Validate a search mode and field list; returns the fields as a list."""
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+        if fields is not None:
+            fields = list(fields)
+            unknown = [field for field in fields if field not in SEARCH_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown result fields {unknown}, expected some of {SEARCH_FIELDS}")
+        return fields
+
+    def _search_with_cache(self, queries: List[str], limit: int, mode: str,
+                           filters: Optional[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Unprojected results per distinct query, via the result cache and in-flight searches."""
+        try:
+            # Repeated queries are answered from memory while the index is unchanged
+            index_version = self.get_index_version()
+            filter_key = json.dumps(filters, sort_keys=True, default=str) if filters else None
+            found = {}
+            for query in queries:
+                cached = self.result_cache.get((query, limit, mode, filter_key))
+                if cached is not None and cached[0] == index_version:
+                    self.logger.debug(f"Result cache hit for query: '{query}'")
+                    found[query] = cached[1]
+
+            # Join searches already in flight; claim the rest for this call
+            owned, joined = {}, {}
+            with self._in_flight_lock:
+                for query in dict.fromkeys(queries):
+                    if query in found:
+                        continue
+                    key = (query, limit, mode, filter_key)
+                    if key in self._in_flight:
+                        joined[query] = self._in_flight[key]
+                    else:
+                        owned[query] = self._in_flight[key] = Future()
+                self.coalesced_searches += len(joined)
+
+            if owned:
+                pending = list(owned)
+                try:
+                    searched, cacheable = self._search_uncached(pending, limit, mode, filters)
+                except BaseException as e:
+                    self._land_searches(owned, limit, mode, filter_key, error=e)
+                    raise
+                for query in pending:
+                    if cacheable:
+                        self.result_cache.put((query, limit, mode, filter_key), (index_version, searched[query]))
+                    self.logger.info(f"Found {len(searched[query])} results for query: '{query}' ({mode})")
+                # Cache first, so callers arriving after the flight lands hit it
+                self._land_searches(owned, limit, mode, filter_key, searched=searched)
+                found.update(searched)
+
+            for query, flight in joined.items():
+                found[query] = flight.result()
+
+            return found
 
         except Exception as e:
             self.logger.error(f"Semantic search failed: {e}")
             raise
 
-    def get_stats(self) -> Dict[str, Any]:
-        """Get statistics about the document collection."""
+    def _land_searches(self, flights: Dict[str, Future], limit: int, mode: str, filter_key: Optional[str],
+                       searched: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                       error: Optional[Exception] = None):
+        """Retire in-flight searches and hand their outcome to any waiters."""
+        with self._in_flight_lock:
+            for query in flights:
+                self._in_flight.pop((query, limit, mode, filter_key), None)
+        for query, flight in flights.items():
+            if error is not None:
+                flight.set_exception(error)
+            else:
+                flight.set_result(searched[query])
+
+    def _search_uncached(self, queries: List[str], limit: int, mode: str,
+                         filters: Optional[Dict[str, Any]]) -> tuple:
+        """Search the indexes for distinct queries.
+
+        Returns:
+            ({query: results}, whether the results may be cached)
+        """
+        doc_ids = self._filter_doc_ids(filters)
+        if doc_ids is not None and not doc_ids:
+            return {query: [] for query in queries}, True
+        if mode == "lexical":
+            return {query: self._lexical_search(query, limit, doc_ids) for query in queries}, True
+
+        try:
+            query_embeddings = self._query_embeddings(queries)
+        except Exception as e:
+            self.logger.warning(f"Embedding backend unavailable ({e}), falling back to lexical search")
+            # Don't pin the degraded answer in the cache
+            return {query: self._lexical_search(query, limit, doc_ids) for query in queries}, False
+
+        searched = dict(zip(queries, self._vector_search_many(queries, query_embeddings, limit, doc_ids)))
+        if mode == "hybrid":
+            searched = {
+                query: self._fuse_results(results, self._lexical_search(query, limit, doc_ids), limit)
+                for query, results in searched.items()
+            }
+        return searched, True
+
+    @staticmethod
+    def _parse_time(value: Any) -> float:
+        """Epoch seconds from a number, datetime or ISO date/datetime string."""
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, datetime):
+            return value.timestamp()
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except ValueError:
+            raise ValueError(f"Invalid date '{value}', expected ISO format such as 2024-05-01") from None
+
+    def _filter_doc_ids(self, filters: Optional[Dict[str, Any]]) -> Optional[set]:
+        """Resolve metadata filters to the set of matching doc ids via the manifest.
+
+        Returns None when nothing is filtered. The set is handed to the vector
+        and lexical indexes so non-matching chunks never compete for top-k.
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value not in (None, "", [])}
+        if not filters:
+            return None
+        unknown = [key for key in filters if key not in FILTER_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown filters {unknown}, expected some of {FILTER_KEYS}")
+
+        clauses = ["COALESCE(chunks, 0) > 0"]
+        params = []
+        prefixes = filters.get("directory")
+        if prefixes is not None:
+            prefixes = [prefixes] if isinstance(prefixes, str) else list(prefixes)
+            prefixes = [prefix.strip("/") for prefix in prefixes]
+            if "" not in prefixes:  # the root prefix matches everything
+                matches = []
+                for prefix in prefixes:
+                    # Whole path components only: "core/ai" must not match "core/aider"
+                    matches.append("directory = ? OR substr(directory, 1, ?) = ?")
+                    params += [prefix, len(prefix) + 1, prefix + "/"]
+                clauses.append("(" + " OR ".join(matches) + ")")
+        if "modified_after" in filters:
+            clauses.append("mtime >= ?")
+            params.append(self._parse_time(filters["modified_after"]))
+        if "modified_before" in filters:
+            clauses.append("mtime < ?")
+            params.append(self._parse_time(filters["modified_before"]))
+
+        rows = self.manifest_conn.execute(
+            f"SELECT doc_id, file_path FROM files WHERE {' AND '.join(clauses)}", params
+        ).fetchall()
+        pattern = filters.get("filename")
+        if pattern:
+            rows = [row for row in rows if fnmatch.fnmatch(os.path.basename(row[1]), pattern)]
+        return {row[0] for row in rows}
+
+    def _project_results(self, results: List[Dict[str, Any]],
+                         fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """Copy results, keeping only ``fields`` and reading content if it is wanted."""
+        return [self._project_result(result, fields) for result in results]
+
+    def _project_result(self, result: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        """Copy one result with only ``fields``, building snippets and content on demand.
+
+        The copy is deep: ``result`` may be held by the result cache, and a
+        caller editing, say, its ``metadata`` must not change later answers.
+        """
+        if (fields is None or "preview" in fields or "snippets" in fields) and result["snippets"] is None:
+            # Kept on the (possibly cached) result so repeat requests reuse them
+            snippets = extract_snippets(result["_chunk_texts"], result["_query"])
+            result["preview"], result["snippets"] = " ... ".join(snippets), snippets
+
+        result = {key: copy.deepcopy(value) for key, value in result.items()
+                  if not key.startswith("_") and (fields is None or key in fields or key == "metadata")}
+        if (fields is None or "content" in fields) and 'byte_start' not in result["metadata"]:
+            # Inline rows: read the current file (by-reference rows use load_content)
+            result["content"] = self._read_document(result["file_path"])
+            if result["content"] is None:
+                result["stale"] = True
+        if fields is not None:
+            result = {field: result.get(field) for field in fields}
+        return result
+
+    def _query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries, using the in-memory query embedding cache; misses go in one batch.
+
+        Query vectors are kept only in that bounded LRU: queries are user
+        input, so persisting them would grow the disk cache without limit.
+        """
+        embeddings = {query: self.query_embedding_cache.get((self.embed_model, query)) for query in queries}
+        missing = [query for query, embedding in embeddings.items() if embedding is None]
+        if missing:
+            # Same endpoint as documents so vectors are comparable
+            for query, embedding in zip(missing, self.get_ollama_embeddings(missing, persist=False)):
+                self.query_embedding_cache.put((self.embed_model, query), embedding)
+                embeddings[query] = embedding
+        return [embeddings[query] for query in queries]
+
+    def _format_result(self, query: str, doc_id: str, metadata: Dict[str, Any], chunk_texts: List[str],
+                       similarity: float, distance: Optional[float], match: str) -> Dict[str, Any]:
+        """Build a document-level search result from its matching chunks (best first).
+
+        A None chunk text marks a by-reference chunk whose file changed since
+        indexing; the result is flagged ``stale``. ``preview``/``snippets``
+        (from the passages that match the query rather than the file head)
+        and ``content`` are filled in by ``_project_result`` only when requested.
+        """
+        stale = any(text is None for text in chunk_texts)
+
+        return {
+            "doc_id": doc_id,
+            "file_path": metadata["file_path"],
+            "filename": metadata["filename"],
+            "directory": metadata["directory"],
+            "similarity": similarity,
+            "distance": distance,
+            "score": similarity,
+            # Reciprocal-rank fusion score, set on hybrid results only
+            "fused_score": None,
+            "match": match,
+            "heading": metadata.get("heading", ""),
+            "matched_chunks": len(chunk_texts),
+            "preview": None,
+            "snippets": None,
+            "content": None,
+            "stale": stale,
+            "metadata": metadata,
+            "_query": query,
+            "_chunk_texts": [text or "" for text in chunk_texts]
+        }
+
+    def _vector_search_many(self, queries: List[str], query_embeddings: List[List[float]], limit: int,
+                            doc_ids: Optional[set] = None) -> List[List[Dict[str, Any]]]:
+        """Nearest-neighbour search over chunk vectors for several queries in one index call."""
+        # Over-fetch chunks so enough distinct documents survive aggregation
+        all_hits = self.store.query_many(self._project(query_embeddings), limit * CHUNK_OVERSAMPLE, doc_ids)
+        return [self._aggregate_hits(query, hits, limit) for query, hits in zip(queries, all_hits)]
+
+    def _aggregate_hits(self, query: str, hits: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        """Turn best-first chunk hits into document-level results."""
+        # Group chunk hits by parent document (results arrive best-first)
+        hits_by_doc = {}
+        for hit in hits:
+            doc_id = hit["metadata"].get("doc_id", hit["id"])
+            hits_by_doc.setdefault(doc_id, []).append(hit)
+
+        # Format results
+        search_results = []
+        for doc_id, doc_hits in list(hits_by_doc.items())[:limit]:
+            distance = doc_hits[0]["distance"]
+            search_results.append(self._format_result(
+                query,
+                doc_id,
+                doc_hits[0]["metadata"],
+                [self._chunk_text(hit["metadata"], hit["document"]) for hit in doc_hits],
+                1 - distance,  # Convert distance to similarity
+                distance,
+                "semantic"
+            ))
+        return search_results
+
+    def _lexical_search(self, query: str, limit: int, doc_ids: Optional[set] = None) -> List[Dict[str, Any]]:
+        """BM25 search over chunks, aggregated to documents. Needs no model call."""
+        hits = self.lexical_index.search(query, limit * CHUNK_OVERSAMPLE, doc_ids)
+        if not hits:
+            return []
+
+        hits_by_doc = {}
+        for hit in hits:
+            hits_by_doc.setdefault(hit["metadata"]["doc_id"], []).append(hit)
+        top_docs = list(hits_by_doc.items())[:limit]
+
+        # Chunk text for previews comes from the vector store by id (no embedding
+        # needed); by-reference chunks are read from the repo without opening it
+        chunk_ids = [hit["id"] for _, doc_hits in top_docs for hit in doc_hits
+                     if 'byte_start' not in hit["metadata"]]
+        texts = self.store.get_documents(chunk_ids) if chunk_ids else {}
+
+        top_score = hits[0]["score"]
+        search_results = []
+        for doc_id, doc_hits in top_docs:
+            result = self._format_result(
+                query,
+                doc_id,
+                doc_hits[0]["metadata"],
+                [self._chunk_text(hit["metadata"], texts.get(hit["id"], "")) for hit in doc_hits],
+                doc_hits[0]["score"] / top_score,  # BM25 normalised to the best hit
+                None,
+                "lexical"
+            )
+            result["score"] = doc_hits[0]["score"]
+            search_results.append(result)
+        return search_results
+
+    def _fuse_results(self, semantic: List[Dict[str, Any]], lexical: List[Dict[str, Any]],
+                      limit: int) -> List[Dict[str, Any]]:
+        """Merge ranked result lists with reciprocal-rank fusion.
+
+        The RRF sum is reported as ``fused_score`` (and ``score``). Only
+        semantic hits keep a ``similarity``: a BM25-only hit's normalised
+        BM25 is on another scale, so its similarity is None.
+        """
+        fused = {}
+        for ranking, source in ((semantic, "semantic"), (lexical, "lexical")):
+            for rank, result in enumerate(ranking, 1):
+                entry = fused.get(result["doc_id"])
+                if entry is None:
+                    # Prefer the semantic entry (listed first) for similarity and preview
+                    entry = fused[result["doc_id"]] = dict(result, fused_score=0.0, match="hybrid")
+                    if source == "lexical":
+                        entry["similarity"] = None
+                entry["fused_score"] += 1.0 / (RRF_K + rank)
+
+        for entry in fused.values():
+            entry["score"] = entry["fused_score"]
+        return sorted(fused.values(), key=lambda result: result["fused_score"], reverse=True)[:limit]
+
+    def _load_projection(self) -> Optional[Dict[str, Any]]:
+        """Load the stored projection, re-reading it if another process refitted it."""
         try:
-            collection_count = self.collection.count()
+            mtime = os.stat(self.projection_path).st_mtime_ns
+        except FileNotFoundError:
+            self._projection = self._projection_mtime = None
+            return None
+        if mtime != self._projection_mtime:
+            import numpy as np
+            with np.load(self.projection_path) as data:
+                self._projection = {
+                    "method": str(data["method"]),
+                    "dim": int(data["dim"]),
+                    "source_dim": int(data["source_dim"]),
+                    "mean": data["mean"],
+                    "components": data["components"]
+                }
+            self._projection_mtime = mtime
+        return self._projection
 
-            # Get directory breakdown if we have documents
-            directory_stats = {}
-            if collection_count > 0:
-                # Query all documents to get metadata
-                all_docs = self.collection.get(include=["metadatas"])
+    def _recover_reduction(self, store_dim: int):
+        """Make the projection files agree with the store's vector dimension.
+
+        A staged projection whose dimension the store already has means a
+        ``reduce`` died after rewriting the store (possibly partway, in
+        which case rows are missing until ``embed --force``): publish it.
+        Otherwise it died before touching the store: drop it. A published
+        projection the store does not match is dropped too.
+        """
+        import numpy as np
+        if os.path.exists(self.pending_projection_path):
+            with np.load(self.pending_projection_path) as data:
+                pending_dim = int(data["dim"])
+            if pending_dim == store_dim:
+                self.logger.warning("Publishing the projection of an interrupted reduce; "
+                                    "run embed --force if documents are missing")
+                os.replace(self.pending_projection_path, self.projection_path)
+            else:
+                os.remove(self.pending_projection_path)
+
+        projection = self._load_projection()
+        if projection is not None and projection["dim"] != store_dim:
+            self.logger.warning(f"Projection to {projection['dim']} dimensions does not match "
+                                f"the {store_dim}-dimension store; removing it")
+            os.remove(self.projection_path)
+            self._load_projection()
+
+    def _projection_info(self) -> Optional[Dict[str, Any]]:
+        projection = self._load_projection()
+        if projection is None:
+            return None
+        return {key: projection[key] for key in ("method", "dim", "source_dim")}
+
+    @staticmethod
+    def _apply_projection(projection: Dict[str, Any], vectors):
+        """Project full-dimension vectors and renormalise them."""
+        import numpy as np
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if projection["method"] == "pca":
+            reduced = (vectors - projection["mean"]) @ projection["components"].T
+        else:
+            # Matryoshka-style models front-load information: keep the prefix
+            reduced = vectors[:, :projection["dim"]]
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return reduced / norms
+
+    def _project(self, embeddings: List[List[float]]) -> List[List[float]]:
+        """Map model embeddings into the index's space (identity when not reduced)."""
+        projection = self._load_projection()
+        if projection is None:
+            return embeddings
+        return self._apply_projection(projection, embeddings).tolist()
+
+    def reduce_dimensions(self, method: str = "pca", dim: int = 256,
+                          sample: int = 100, k: int = 10, seed: int = 0) -> Dict[str, Any]:
+        """Shrink the stored vectors to ``dim`` dimensions in place.
+
+        ``pca`` fits a projection on the indexed chunks; ``truncate`` keeps
+        the leading dimensions of Matryoshka-trained embeddings. The
+        projection is saved next to the index and applied to every later
+        document and query embedding. Sampled stored vectors serve as
+        queries to report top-k overlap with the full-dimension index.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("NumPy not installed. Run: pip install numpy")
+
+        if method not in REDUCTION_METHODS:
+            raise ValueError(f"Unknown reduction method '{method}', expected one of {REDUCTION_METHODS}")
+
+        rows = self.store.get_all()
+        if not len(rows["ids"]):
+            return {"error": "index is empty"}
+
+        vectors = np.asarray(rows["embeddings"], dtype=np.float32)
+        self._recover_reduction(vectors.shape[1])
+        existing = self._projection_info()
+        if existing is not None:
+            return {"error": f"index is already reduced to {existing['dim']} dimensions; "
+                             "rebuild with embed --force first"}
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        source_dim = vectors.shape[1]
+        if not 0 < dim < source_dim:
+            raise ValueError(f"Target dimension must be between 1 and {source_dim - 1}, got {dim}")
+
+        self.logger.info(f"Reducing {len(vectors)} vectors from {source_dim} to {dim} dimensions ({method})")
+        if method == "pca":
+            mean = vectors.mean(axis=0)
+            centred = vectors - mean
+            # Eigenvectors of the covariance, largest variance first
+            eigenvalues, eigenvectors = np.linalg.eigh(centred.T @ centred)
+            order = np.argsort(eigenvalues)[::-1]
+            components = eigenvectors[:, order[:dim]].T.astype(np.float32)
+            explained = float(eigenvalues[order[:dim]].sum() / max(eigenvalues.sum(), 1e-12))
+        else:
+            mean = np.zeros(source_dim, dtype=np.float32)
+            components = np.zeros((0, source_dim), dtype=np.float32)
+            explained = None
+
+        projection = {"method": method, "dim": dim, "source_dim": source_dim,
+                      "mean": mean.astype(np.float32), "components": components}
+        reduced = self._apply_projection(projection, vectors).astype(np.float32)
+
+        # Compare nearest neighbours in both spaces before the originals go
+        rng = np.random.default_rng(seed)
+        picks = np.sort(rng.choice(len(vectors), size=min(sample, len(vectors)), replace=False))
+        k = min(k, len(vectors))
+        overlaps = []
+        full_seconds = reduced_seconds = 0.0
+        for row in picks:
+            start = time.perf_counter()
+            full_top = np.argpartition(-(vectors @ vectors[row]), k - 1)[:k]
+            full_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            reduced_top = np.argpartition(-(reduced @ reduced[row]), k - 1)[:k]
+            reduced_seconds += time.perf_counter() - start
+            overlaps.append(len(set(full_top.tolist()) & set(reduced_top.tolist())) / k)
+
+        # The projection is staged, the store rewritten at the new dimension,
+        # and only then is the projection published: queries are never
+        # projected against full-dimension vectors, and a run that dies
+        # midway is finished or undone by _recover_reduction
+        tmp_path = self.projection_path + ".tmp.npz"
+        np.savez(tmp_path, method=np.array(method), dim=np.array(dim),
+                 source_dim=np.array(source_dim), mean=projection["mean"], components=components)
+        os.replace(tmp_path, self.pending_projection_path)
+
+        self.store.clear()
+        for start in range(0, len(rows["ids"]), 1000):
+            end = start + 1000
+            self.store.upsert(
+                ids=list(rows["ids"][start:end]),
+                embeddings=reduced[start:end].tolist(),
+                documents=list(rows["documents"][start:end]),
+                metadatas=list(rows["metadatas"][start:end])
+            )
+        os.replace(self.pending_projection_path, self.projection_path)
+        self._bump_index_version()
+
+        return {
+            "method": method,
+            "source_dim": source_dim,
+            "dim": dim,
+            "rows": len(vectors),
+            "explained_variance": round(explained, 4) if explained is not None else None,
+            "queries": len(picks),
+            f"overlap@{k}": round(sum(overlaps) / len(overlaps), 4),
+            "bytes_per_vector": {"full": source_dim * 4, "reduced": dim * 4},
+            "mean_scan_ms": {"full": round(1000 * full_seconds / len(picks), 3),
+                             "reduced": round(1000 * reduced_seconds / len(picks), 3)}
+        }
 
-                for metadata in all_docs["metadatas"]:
-                    directory = metadata.get("directory", "root")
-                    directory_stats[directory] = directory_stats.get(directory, 0) + 1
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about the document collection."""
+        try:
+            # Aggregates maintained during ingestion; no pass over the collection
+            rows = self.manifest_conn.execute(
+                "SELECT directory, documents, chunks, bytes, last_indexed_at "
+                "FROM directory_stats WHERE documents > 0 ORDER BY directory"
+            ).fetchall()
+            directory_stats = {row[0]: row[1] for row in rows}
 
             stats = {
-                "total_documents": collection_count,
+                "total_documents": sum(directory_stats.values()),
+                "total_chunks": sum(row[2] for row in rows),
+                "total_bytes": sum(row[3] for row in rows),
+                "last_indexed_at": max((row[4] for row in rows if row[4]), default=None),
                 "directories": len(directory_stats),
                 "directory_breakdown": directory_stats,
                 "embedding_model": self.embed_model,
+                "vector_backend": self.vector_backend,
+                "projection": self._projection_info(),
                 "chroma_db_path": self.chroma_db_path,
                 "qry_repo_path": self.qry_repo_path
             }
@@ -343,12 +2895,13 @@ class QRYDocSearch:
         status = {
             "ollama": False,
             "chromadb": False,
-            "embedding_model": self.embed_model
+            "embedding_model": self.embed_model,
+            "vector_backend": self.vector_backend
         }
 
         # Test Ollama
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.ollama_url}/api/tags", timeout=5)
             response.raise_for_status()
             status["ollama"] = True
 
@@ -363,7 +2916,7 @@ class QRYDocSearch:
 
         # Test ChromaDB
         try:
-            collection_count = self.collection.count()
+            collection_count = self.store.count()
             status["chromadb"] = True
             status["document_count"] = collection_count
 
@@ -373,10 +2926,140 @@ class QRYDocSearch:
 
         return status
 
+    def reindex_paths(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Upsert or delete only the given files.
+
+        Paths that still exist are re-embedded if their content hash changed;
+        paths that are gone are removed from the index and the manifest.
+        """
+        manifest = self._load_manifest()
+        to_embed = []
+        removed = []
+        unchanged_count = 0
+
+        for path in sorted(set(paths)):
+            full_path = os.path.join(self.qry_repo_path, path)
+            if not self._is_indexable(full_path):
+                continue
+            relative_path = os.path.relpath(os.path.abspath(full_path), os.path.abspath(self.qry_repo_path))
+            entry = manifest.get(relative_path)
+
+            if not os.path.isfile(full_path):
+                if entry is not None:
+                    removed.append(relative_path)
+                continue
+
+            doc_info = self._describe_file(os.path.abspath(full_path))
+            if doc_info is None or self.load_document(doc_info) is None:
+                continue
+            if entry is not None and entry['content_hash'] == doc_info['content_hash']:
+                self._record_manifest([doc_info])
+                unchanged_count += 1
+                continue
+            to_embed.append(doc_info)
+
+        if removed:
+            self._delete_documents([manifest[path]['doc_id'] for path in removed])
+            self._forget_manifest(removed)
+            for path in removed:
+                self.logger.info(f"Removed: {path}")
+
+        progress = self._embed_in_batches(to_embed)
+        for doc_info in to_embed:
+            self.logger.info(f"Re-indexed: {doc_info['file_path']}")
+
+        return {
+            "embedded": progress["embedded"],
+            "failed": progress["failed"],
+            "unchanged": unchanged_count,
+            "removed": len(removed)
+        }
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        """Map each indexable file to its (mtime, size) for change polling."""
+        return {doc_info['file_path']: (doc_info['mtime'], doc_info['bytes'])
+                for doc_info in self.iter_markdown_files()}
+
+    def watch(self, interval: float = 1.0, debounce: float = 2.0, use_polling: bool = False):
+        """Keep the index in sync with the working tree until interrupted.
+
+        Filesystem events come from ``watchdog`` when it is installed,
+        otherwise the tree is polled for mtime/size changes every
+        ``interval`` seconds. Changes are collected until ``debounce``
+        seconds pass without new ones, then only the affected documents
+        are re-indexed.
+        """
+        # Catch up with anything that changed while nobody was watching
+        self.embed_changed_documents()
+
+        pending = set()
+        last_change = 0.0
+        lock = threading.Lock()
+
+        def mark(*changed_paths):
+            nonlocal last_change
+            with lock:
+                for path in changed_paths:
+                    if path and self._is_indexable(path):
+                        pending.add(os.path.relpath(os.path.abspath(path), os.path.abspath(self.qry_repo_path)))
+                        last_change = time.monotonic()
+
+        observer = None
+        if not use_polling:
+            try:
+                from watchdog.observers import Observer
+                from watchdog.events import FileSystemEventHandler
+
+                class Handler(FileSystemEventHandler):
+                    def on_any_event(self, event):
+                        # Ignore opened/closed events, which our own reads would trigger
+                        if not event.is_directory and event.event_type in ('created', 'modified', 'deleted', 'moved'):
+                            mark(event.src_path, getattr(event, 'dest_path', None))
+
+                observer = Observer()
+                observer.schedule(Handler(), self.qry_repo_path, recursive=True)
+                observer.start()
+                self.logger.info(f"Watching {self.qry_repo_path} for filesystem events")
+
+            except ImportError:
+                self.logger.info("watchdog not installed, falling back to mtime polling")
+
+        snapshot = self._snapshot() if observer is None else None
+        if observer is None:
+            self.logger.info(f"Polling {self.qry_repo_path} every {interval}s")
+
+        try:
+            while True:
+                time.sleep(interval)
+
+                if observer is None:
+                    current = self._snapshot()
+                    changed = [path for path, stat in current.items() if snapshot.get(path) != stat]
+                    changed += [path for path in snapshot if path not in current]
+                    snapshot = current
+                    mark(*(os.path.join(self.qry_repo_path, path) for path in changed))
+
+                with lock:
+                    if not pending or time.monotonic() - last_change < debounce:
+                        continue
+                    batch = set(pending)
+                    pending.clear()
+
+                result = self.reindex_paths(batch)
+                self.logger.info(
+                    f"Index updated: {result['embedded']} embedded, "
+                    f"{result['removed']} removed, {result['failed']} failed"
+                )
+
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
     def reset_collection(self):
         """Reset the document collection (delete all embeddings)."""
         try:
-            self.collection.delete(where={})
+            self._clear_collection()
             self.logger.info("Collection reset complete")
 
         except Exception as e:
@@ -384,8 +3067,223 @@ class QRYDocSearch:
             raise
 
 
-def main():
-    """Main CLI interface for QRY doc search."""
+def read_queries(path: str) -> List[Dict[str, Any]]:
+    """Read a queries file: one query per line, or JSON objects with a "query" key.
+
+    JSON lines may carry their own "limit"; any other keys are echoed into the
+    output records. Blank lines and lines starting with '#' are skipped; '-'
+    reads standard input.
+    """
+    handle = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+    try:
+        entries = []
+        for line in handle:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line) if line.startswith("{") else {"query": line}
+            if not entry.get("query"):
+                raise ValueError(f"Query file entry without a query: {line}")
+            entries.append(entry)
+        return entries
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+# Commands the socket daemon answers; anything else runs in the caller's process
+SERVED_COMMANDS = ("search", "stats", "test")
+
+# Exit status (EX_TEMPFAIL) telling a client to run the command itself
+DAEMON_UNAVAILABLE = 75
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".local/share/qry-doc-search/qry-search.sock")
+
+
+def serve(searcher: QRYDocSearch, parser, daemon_args):
+    """Answer CLI commands over a Unix socket with one warm searcher.
+
+    Each connection sends one JSON line {"argv": [...], "cwd": path} (the
+    arguments after ``qry_doc_search.py`` and the client's working directory)
+    and receives {"exit": status, "stdout": text}. The client passes its
+    standard input as a file descriptor alongside the request, so
+    ``--queries-file -`` reads the caller's stdin; relative paths are
+    resolved against "cwd". Requests run one at a time, so command output can
+    be captured by redirecting stdout and stdin. Commands outside
+    SERVED_COMMANDS, global options that differ from the daemon's own, and
+    arguments that cannot be resolved in the caller's context (a relative
+    path without "cwd", stdin without a descriptor) get DAEMON_UNAVAILABLE so
+    the client falls back to running in-process.
+    """
+    import contextlib
+    import io
+    import signal
+    import socket
+    import socketserver
+
+    socket_path = daemon_args.socket
+    global_options = set(vars(parser.parse_args(["stats"]))) - {"command"}
+    # Path-valued options are compared (and opened) as absolute paths
+    path_options = ("qry_repo", "chroma_db", "embed_cache", "queries_file")
+
+    def resolve_paths(args, cwd: Optional[str]) -> bool:
+        """Make path options absolute against the client's cwd; False if impossible."""
+        for option in path_options:
+            value = getattr(args, option, None)
+            if value is None or value == "-" or os.path.isabs(value):
+                continue
+            if cwd is None:
+                return False
+            setattr(args, option, os.path.normpath(os.path.join(cwd, value)))
+        return True
+
+    for option in path_options:
+        if getattr(daemon_args, option, None) is not None:
+            setattr(daemon_args, option, os.path.abspath(getattr(daemon_args, option)))
+
+    def handle_request(argv: List[str], cwd: Optional[str] = None,
+                       stdin_fd: Optional[int] = None) -> Dict[str, Any]:
+        out = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                args = parse_cli_args(parser, argv)
+        except SystemExit as e:
+            # --help or a usage error; argparse already wrote the message
+            return {"exit": e.code or 0, "stdout": out.getvalue()}
+
+        if args.command not in SERVED_COMMANDS or not resolve_paths(args, cwd) or any(
+                getattr(args, option) != getattr(daemon_args, option) for option in global_options):
+            return {"exit": DAEMON_UNAVAILABLE, "stdout": ""}
+        if getattr(args, "queries_file", None) == "-" and stdin_fd is None:
+            return {"exit": DAEMON_UNAVAILABLE, "stdout": ""}
+
+        searcher.refresh()
+        status = 0
+        stdin = io.StringIO() if stdin_fd is None else open(stdin_fd, 'r', encoding='utf-8', closefd=False)
+        saved_stdin, sys.stdin = sys.stdin, stdin
+        try:
+            with contextlib.redirect_stdout(out):
+                run_command(searcher, args)
+        except Exception:
+            # run_command has already printed the error
+            status = 1
+        finally:
+            sys.stdin = saved_stdin
+            stdin.close()
+        return {"exit": status, "stdout": out.getvalue()}
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            # The client's stdin descriptor arrives with the first bytes
+            data, fds, _, _ = socket.recv_fds(self.request, 65536, 1)
+            try:
+                while data and not data.endswith(b"\n"):
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        break
+                    data += chunk
+                request = json.loads(data or b"{}")
+                response = handle_request([str(arg) for arg in request.get("argv", [])],
+                                          request.get("cwd"), fds[0] if fds else None)
+            except ValueError as e:
+                response = {"exit": 2, "stdout": f"Bad request: {e}\n"}
+            finally:
+                for fd in fds:
+                    os.close(fd)
+            self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+
+    if os.path.exists(socket_path):
+        # Refuse to steal a live daemon's socket; clear one left by a crash
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(socket_path)
+            else:
+                searcher.logger.error(f"A daemon is already listening on {socket_path}")
+                sys.exit(1)
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+
+    server = socketserver.UnixStreamServer(socket_path, Handler)
+    os.chmod(socket_path, 0o600)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Background jobs ignore SIGINT, so also stop (and unlink) on SIGTERM
+    signal.signal(signal.SIGTERM, stop)
+
+    # Pay the cold costs now rather than on the first forwarded command:
+    # opening the vector store and lexical index, and loading the model
+    searcher.store.count()
+    searcher.lexical_index.count()
+    try:
+        searcher.semantic_search("qry documentation", limit=1)
+    except Exception as e:
+        searcher.logger.warning(f"Warm-up search failed: {e}")
+
+    searcher.logger.info(f"Serving {', '.join(SERVED_COMMANDS)} on {socket_path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nDaemon stopped.")
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+# Commands timed by bench-startup with their cold-start budgets (ms). None
+# needs Ollama; only the search opens the vector store (ChromaDB is ~1 s of it)
+STARTUP_BENCHMARKS = {
+    "help": (["--help"], 300),
+    "stats": (["stats"], 400),
+    "lexical-search": (["search", "startup benchmark", "--mode", "lexical", "--limit", "5"], 2000),
+}
+
+
+def benchmark_startup(global_argv: List[str], runs: int = 5,
+                      budget_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Time cold starts of the CLI, each in a fresh interpreter.
+
+    Reports median and worst wall time per command next to a bare
+    interpreter start, and whether each median is within its budget
+    (``budget_ms`` overrides the per-command defaults).
+    """
+    import statistics
+    import subprocess
+
+    def time_runs(argv: List[str]) -> List[float]:
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    interpreter = time_runs([sys.executable, "-c", "pass"])
+    commands = {}
+    for name, (command, default_budget) in STARTUP_BENCHMARKS.items():
+        timings = time_runs([sys.executable, os.path.abspath(__file__)] + global_argv + command)
+        median = statistics.median(timings)
+        budget = default_budget if budget_ms is None else budget_ms
+        commands[name] = {
+            "median_ms": round(median, 1),
+            "max_ms": round(max(timings), 1),
+            "budget_ms": budget,
+            "within_budget": median <= budget
+        }
+
+    return {
+        "runs": runs,
+        "interpreter_ms": round(statistics.median(interpreter), 1),
+        "commands": commands,
+        "within_budget": all(result["within_budget"] for result in commands.values())
+    }
+
+
+def build_parser():
+    """Argument parser shared by the CLI and the socket daemon."""
     import argparse
 
     parser = argparse.ArgumentParser(description="QRY Documentation Semantic Search")
@@ -393,29 +3291,101 @@ def main():
     parser.add_argument("--chroma-db", help="Path to ChromaDB storage")
     parser.add_argument("--ollama-url", default="http://localhost:11434", help="Ollama API URL")
     parser.add_argument("--embed-model", default="nomic-embed-text", help="Embedding model")
+    parser.add_argument("--batch-size", type=int, default=16, help="Documents per embedding request")
+    parser.add_argument("--embed-cache", help="Path to the on-disk embedding cache")
+    parser.add_argument("--no-embed-cache", action="store_true", help="Always request fresh embeddings from Ollama")
+    parser.add_argument("--vector-backend", choices=sorted(VECTOR_BACKENDS), default="chroma",
+                        help="Vector index backend")
+    parser.add_argument("--vector-dtype", choices=["float32", "float16"], default="float32",
+                        help="Vector precision for the numpy backend")
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default="none",
+                        help="Quantized first-pass scan for the numpy backend")
+    parser.add_argument("--rerank-factor", type=int, default=10,
+                        help="Shortlist size (x limit) re-ranked at full precision")
+    parser.add_argument("--storage", choices=STORAGE_MODES, default="inline",
+                        help="Keep chunk text in the index, or only offsets into the repo files")
+    parser.add_argument("--timing", action="store_true",
+                        help="Report import, init and command time on stderr")
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # Embed command
     embed_parser = subparsers.add_parser("embed", help="Embed all documents")
     embed_parser.add_argument("--force", action="store_true", help="Force rebuild of embeddings")
+    embed_parser.add_argument("--incremental", action="store_true",
+                              help="Only re-embed added/changed files and remove deleted ones")
+    embed_parser.add_argument("--workers", type=int, default=1, help="Concurrent embedding requests")
+    embed_parser.add_argument("--chunk-size", type=int, default=2000, help="Maximum characters per chunk")
+    embed_parser.add_argument("--retries", type=int, default=3,
+                              help="Retry passes for documents that failed transiently")
+    embed_parser.add_argument("--retry-delay", type=float, default=2.0,
+                              help="Seconds before the first retry pass (doubles each pass)")
 
     # Search command
     search_parser = subparsers.add_parser("search", help="Search documents")
-    search_parser.add_argument("query", help="Search query")
+    search_parser.add_argument("query", nargs="?", help="Search query")
+    search_parser.add_argument("--queries-file",
+                               help="Run every query in this file ('-' for stdin) and print JSON Lines")
     search_parser.add_argument("--limit", type=int, default=10, help="Max results")
     search_parser.add_argument("--show-content", action="store_true", help="Show full content")
+    search_parser.add_argument("--mode", choices=SEARCH_MODES, default="semantic",
+                               help="Vector, BM25 keyword, or fused hybrid ranking")
+    search_parser.add_argument("--directory", action="append",
+                               help="Only documents under this directory prefix (repeatable)")
+    search_parser.add_argument("--modified-after", help="Only documents modified on/after this ISO date")
+    search_parser.add_argument("--modified-before", help="Only documents modified before this ISO date")
+    search_parser.add_argument("--filename", help="Only documents whose file name matches this glob")
+
+    # Watch command
+    watch_parser = subparsers.add_parser("watch", help="Keep the index in sync with the working tree")
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="Seconds between checks")
+    watch_parser.add_argument("--debounce", type=float, default=2.0, help="Quiet seconds before re-indexing")
+    watch_parser.add_argument("--poll", action="store_true", help="Poll mtimes instead of using filesystem events")
+    watch_parser.add_argument("--chunk-size", type=int, default=2000, help="Maximum characters per chunk")
 
     # Stats command
     subparsers.add_parser("stats", help="Show collection statistics")
 
+    # Quantization benchmark command
+    bench_parser = subparsers.add_parser("bench-quant", help="Benchmark quantized search (numpy backend)")
+    bench_parser.add_argument("--sample", type=int, default=100, help="Stored vectors used as queries")
+    bench_parser.add_argument("--k", type=int, default=10, help="Recall cutoff")
+
+    # Dimensionality reduction command
+    reduce_parser = subparsers.add_parser("reduce", help="Shrink stored vectors with PCA or prefix truncation")
+    reduce_parser.add_argument("--method", choices=REDUCTION_METHODS, default="pca",
+                               help="Fit PCA on the corpus, or truncate Matryoshka-style embeddings")
+    reduce_parser.add_argument("--dim", type=int, default=256, help="Target dimension")
+    reduce_parser.add_argument("--sample", type=int, default=100, help="Stored vectors used as overlap queries")
+    reduce_parser.add_argument("--k", type=int, default=10, help="Overlap cutoff")
+
     # Test command
     subparsers.add_parser("test", help="Test connections")
 
+    # Startup benchmark command
+    startup_parser = subparsers.add_parser("bench-startup", help="Time cold CLI starts against a budget")
+    startup_parser.add_argument("--runs", type=int, default=5, help="Cold starts per command")
+    startup_parser.add_argument("--budget-ms", type=float,
+                                help="Budget for every command instead of the per-command defaults")
+
+    # Compaction command
+    subparsers.add_parser("compact", help="Merge the numpy index's segments and drop deleted rows")
+
     # Reset command
     subparsers.add_parser("reset", help="Reset collection")
 
-    args = parser.parse_args()
+    # Daemon command
+    serve_parser = subparsers.add_parser("serve", help="Answer search/stats/test from a warm process on a Unix socket")
+    serve_parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Socket path")
+
+    return parser
+
+
+def main():
+    """Main CLI interface for QRY doc search."""
+    imported = time.perf_counter()
+    parser = build_parser()
+    args = parse_cli_args(parser)
 
     if not args.command:
         parser.print_help()
@@ -426,32 +3396,136 @@ def main():
         qry_repo_path=args.qry_repo,
         chroma_db_path=args.chroma_db,
         ollama_url=args.ollama_url,
-        embed_model=args.embed_model
+        embed_model=args.embed_model,
+        batch_size=args.batch_size,
+        workers=getattr(args, "workers", 1),
+        chunk_size=getattr(args, "chunk_size", 2000),
+        embedding_cache_path=args.embed_cache,
+        use_embedding_cache=not args.no_embed_cache,
+        vector_backend=args.vector_backend,
+        vector_dtype=args.vector_dtype,
+        quantization=args.quantization,
+        rerank_factor=args.rerank_factor,
+        storage_mode=args.storage,
+        retries=getattr(args, "retries", 3),
+        retry_delay=getattr(args, "retry_delay", 2.0)
     )
+    initialised = time.perf_counter()
 
+    try:
+        if args.command == "serve":
+            serve(searcher, parser, args)
+        elif args.command == "bench-startup":
+            # Re-run the CLI with the same global options as this invocation
+            global_argv = sys.argv[1:sys.argv.index(args.command)]
+            report = benchmark_startup(global_argv, runs=args.runs, budget_ms=args.budget_ms)
+            print(json.dumps(report, indent=2))
+            if not report["within_budget"]:
+                sys.exit(1)
+        else:
+            run_command(searcher, args)
+    except BackendMismatchError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.timing:
+            finished = time.perf_counter()
+            opened = ""
+            if searcher.store_open_seconds is not None:
+                opened = f" (vector store opened in {searcher.store_open_seconds * 1000:.1f} ms)"
+            print(f"Timing: import {(imported - _IMPORT_STARTED) * 1000:.1f} ms, "
+                  f"init {(initialised - imported) * 1000:.1f} ms, "
+                  f"command {(finished - initialised) * 1000:.1f} ms{opened}", file=sys.stderr)
+
+
+def parse_cli_args(parser, argv: Optional[List[str]] = None):
+    """Parse CLI arguments, plus the checks argparse cannot express (usage errors exit 2)."""
+    args = parser.parse_args(argv)
+    if args.command == "search" and bool(args.query) == bool(args.queries_file):
+        parser.error("search takes either a query or --queries-file")
+    return args
+
+
+def run_command(searcher: QRYDocSearch, args):
+    """Run a parsed CLI command against an initialised searcher."""
     try:
         if args.command == "embed":
             print("Embedding documents...")
-            result = searcher.embed_all_documents(force_rebuild=args.force)
+            result = searcher.embed_all_documents(force_rebuild=args.force, incremental=args.incremental)
             print(f"Result: {json.dumps(result, indent=2)}")
 
         elif args.command == "search":
+            filters = {
+                "directory": args.directory,
+                "modified_after": args.modified_after,
+                "modified_before": args.modified_before,
+                "filename": args.filename
+            }
+
+            if args.queries_file:
+                entries = read_queries(args.queries_file)
+                fields = ["file_path", "directory", "filename", "similarity", "match", "heading", "preview"]
+                if args.show_content:
+                    fields.append("content")
+                # One batched search per distinct limit
+                by_limit = {}
+                for entry in entries:
+                    by_limit.setdefault(int(entry.get("limit", args.limit)), []).append(entry)
+                results_by_entry = {}
+                for limit, group in by_limit.items():
+                    batch = searcher.semantic_search_many([entry["query"] for entry in group], limit=limit,
+                                                          mode=args.mode, fields=fields, filters=filters)
+                    results_by_entry.update(zip(map(id, group), batch))
+                for entry in entries:
+                    results = results_by_entry[id(entry)]
+                    if args.show_content:
+                        for result in results:
+                            result["content"] = searcher.load_content(result)
+                    print(json.dumps(dict(entry, mode=args.mode, count=len(results), results=results)))
+                return
+
             print(f"Searching for: '{args.query}'")
-            results = searcher.semantic_search(args.query, limit=args.limit)
+            fields = ["similarity", "file_path", "directory", "preview", "metadata"]
+            if args.show_content:
+                fields.append("content")
+            results = searcher.semantic_search(args.query, limit=args.limit, mode=args.mode,
+                                               fields=fields, filters=filters)
 
             for i, result in enumerate(results, 1):
-                print(f"\n--- Result {i} (similarity: {result['similarity']:.3f}) ---")
+                # None for hybrid hits found by BM25 alone
+                similarity = "n/a, keyword match" if result['similarity'] is None else f"{result['similarity']:.3f}"
+                print(f"\n--- Result {i} (similarity: {similarity}) ---")
                 print(f"File: {result['file_path']}")
                 print(f"Directory: {result['directory']}")
 
                 if args.show_content:
-                    print(f"Content:\n{result['content'][:500]}...")
+                    print(f"Content:\n{(searcher.load_content(result) or '')[:500]}...")
                 else:
                     print(f"Preview: {result['preview']}")
 
             if not results:
                 print("No results found.")
 
+        elif args.command == "watch":
+            print("Watching for changes (Ctrl+C to stop)...")
+            searcher.watch(interval=args.interval, debounce=args.debounce, use_polling=args.poll)
+
+        elif args.command == "bench-quant":
+            if not isinstance(searcher.store, NumpyVectorStore):
+                print("bench-quant needs --vector-backend numpy")
+                return
+            print(json.dumps(searcher.store.benchmark_quantization(sample=args.sample, k=args.k), indent=2))
+
+        elif args.command == "compact":
+            if not isinstance(searcher.store, NumpyVectorStore):
+                print("compact needs --vector-backend numpy")
+                return
+            print(json.dumps(searcher.store.compact(force=True), indent=2))
+
+        elif args.command == "reduce":
+            report = searcher.reduce_dimensions(method=args.method, dim=args.dim, sample=args.sample, k=args.k)
+            print(json.dumps(report, indent=2))
+
         elif args.command == "stats":
             stats = searcher.get_stats()
             print(json.dumps(stats, indent=2))
@@ -470,6 +3544,9 @@ def main():
 
     except KeyboardInterrupt:
         print("\nOperation cancelled.")
+    except BackendMismatchError:
+        # Reported by main() on one line
+        raise
     except Exception as e:
         print(f"Error: {e}")
         raise
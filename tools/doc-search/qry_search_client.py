@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Thin client for the QRY doc search daemon (``qry_doc_search.py serve``).
+
+Usage: qry_search_client.py SOCKET_PATH <qry_doc_search.py arguments...>
+
+Forwards the arguments and the working directory over the Unix socket, with
+standard input passed as a file descriptor (so ``--queries-file -`` and
+relative paths mean what they would locally), prints the daemon's output and
+exits with its status. Exits 75 (EX_TEMPFAIL) when no daemon answers or the
+daemon declines the command, so callers can fall back to running
+qry_doc_search.py in-process. Standard library only, to keep startup cheap.
+"""
+
+import json
+import os
+import socket
+import sys
+
+DAEMON_UNAVAILABLE = 75
+
+
+def main() -> int:
+    if len(sys.argv) < 2:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+
+    socket_path, argv = sys.argv[1], sys.argv[2:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(socket_path)
+            request = (json.dumps({"argv": argv, "cwd": os.getcwd()}) + "\n").encode("utf-8")
+            if sys.stdin is None:
+                conn.sendall(request)
+            else:
+                sent = socket.send_fds(conn, [request], [sys.stdin.fileno()])
+                if sent < len(request):
+                    conn.sendall(request[sent:])
+            with conn.makefile("rb") as reply:
+                response = json.loads(reply.readline())
+    except (OSError, ValueError):
+        return DAEMON_UNAVAILABLE
+
+    sys.stdout.write(response.get("stdout", ""))
+    return int(response.get("exit", 1))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
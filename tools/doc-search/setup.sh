@@ -148,7 +148,15 @@ else
 fi
 
 # Step 9: Embed documents
-if [[ "$EMBED_COUNT" -eq "0" ]] || [[ -n "$FORCE_REBUILD" ]]; then
+if [[ "$EMBED_COUNT" -gt "0" ]] && [[ -z "$FORCE_REBUILD" ]]; then
+    # Picks up files an interrupted run never reached, plus any changes
+    log_info "Resuming/updating existing embeddings..."
+    if source venv/bin/activate && python qry_doc_search.py embed; then
+        log_success "Embeddings up to date"
+    else
+        log_warning "Embedding stopped early; re-run 'python qry_doc_search.py embed' to resume"
+    fi
+else
     log_info "Embedding QRY documentation (this will take several minutes)..."
     echo "📚 Processing approximately 673 markdown files..."
 
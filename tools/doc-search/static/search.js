@@ -0,0 +1,183 @@
+// Global state
+let isSearching = false;
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.getElementById('searchInput');
+
+    // Enter key support
+    searchInput.addEventListener('keypress', function(e) {
+        if (e.key === 'Enter' && !isSearching) {
+            performSearch();
+        }
+    });
+
+    // Auto-focus search input
+    searchInput.focus();
+});
+
+async function performSearch() {
+    if (isSearching) return;
+
+    const query = document.getElementById('searchInput').value.trim();
+    if (!query) {
+        showError('Please enter a search query');
+        return;
+    }
+
+    isSearching = true;
+    const searchBtn = document.querySelector('.search-btn');
+    const resultsContainer = document.getElementById('resultsContainer');
+
+    // Update UI
+    searchBtn.textContent = 'Searching...';
+    searchBtn.disabled = true;
+    resultsContainer.innerHTML = '<div class="loading">Searching QRY documentation...</div>';
+
+    try {
+        const limit = document.getElementById('limitSelect').value;
+        const showContent = document.getElementById('showContent').checked;
+        const mode = document.getElementById('modeSelect').value;
+
+        // GET, so a repeat search revalidates against the browser cache
+        // and the server can answer 304 while the index is unchanged
+        const params = new URLSearchParams({
+            query: query,
+            limit: limit,
+            mode: mode,
+            // Only what renderResult renders
+            fields: ['filename', 'file_path', 'directory', 'similarity', 'metadata',
+                     showContent ? 'content' : 'preview'].join(','),
+            stream: 'ndjson'
+        });
+        const response = await fetch(`/api/search?${params}`);
+
+        if (!response.ok) {
+            throw new Error(`Search failed: ${response.status}`);
+        }
+
+        // Render each hit as its line arrives
+        const header = document.createElement('h3');
+        resultsContainer.innerHTML = '';
+        resultsContainer.appendChild(header);
+        header.textContent = `Searching for "${query}"...`;
+
+        let count = 0;
+        await readLines(response, line => {
+            const event = JSON.parse(line);
+            if (event.type === 'result') {
+                resultsContainer.insertAdjacentHTML('beforeend', renderResult(event.result, showContent));
+                count++;
+                header.textContent = `Found ${count} results for "${query}"...`;
+            } else if (event.type === 'error') {
+                throw new Error(event.error);
+            }
+        });
+
+        if (count === 0) {
+            displayResults([], query);
+        } else {
+            header.textContent = `Found ${count} results for "${query}"`;
+        }
+
+    } catch (error) {
+        showError(`Search failed: ${error.message}`);
+    } finally {
+        isSearching = false;
+        searchBtn.textContent = 'Search';
+        searchBtn.disabled = false;
+    }
+}
+
+async function readLines(response, onLine) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        lines.filter(line => line.trim()).forEach(onLine);
+        if (done) break;
+    }
+    if (buffered.trim()) onLine(buffered);
+}
+
+function renderResult(result, showContent) {
+    // Hybrid hits found by keyword search alone have no similarity
+    const similarity = result.similarity === null
+        ? 'keyword'
+        : `${(result.similarity * 100).toFixed(1)}%`;
+    const directory = result.directory || 'root';
+
+    return `
+        <div class="result-item">
+            <div class="result-header">
+                <div class="result-title">${escapeHtml(result.filename)}</div>
+                <div class="result-similarity">${similarity} match</div>
+            </div>
+
+            <div class="result-path">${escapeHtml(result.file_path)}</div>
+
+            <div class="result-preview">
+                ${escapeHtml(showContent ? result.content : result.preview)}
+            </div>
+
+            <div class="result-meta">
+                <span>📁 ${escapeHtml(directory)}</span>
+                <span>📄 ${result.metadata.size} chars</span>
+                <span>🕒 ${formatDate(result.metadata.modified)}</span>
+            </div>
+        </div>
+    `;
+}
+
+function displayResults(results, query) {
+    const resultsContainer = document.getElementById('resultsContainer');
+    const showContent = document.getElementById('showContent').checked;
+
+    if (!results || results.length === 0) {
+        resultsContainer.innerHTML = `
+            <div class="no-results">
+                <h3>No results found</h3>
+                <p>Try different keywords or check the spelling of your query: "${query}"</p>
+            </div>
+        `;
+        return;
+    }
+
+    let html = `<h3>Found ${results.length} results for "${query}"</h3>`;
+
+    results.forEach(result => {
+        html += renderResult(result, showContent);
+    });
+
+    resultsContainer.innerHTML = html;
+}
+
+function showError(message) {
+    const resultsContainer = document.getElementById('resultsContainer');
+    resultsContainer.innerHTML = `<div class="error">${escapeHtml(message)}</div>`;
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function formatDate(dateString) {
+    try {
+        const date = new Date(dateString);
+        return date.toLocaleDateString();
+    } catch {
+        return dateString;
+    }
+}
+
+// Example searches
+function searchExample(query) {
+    document.getElementById('searchInput').value = query;
+    performSearch();
+}
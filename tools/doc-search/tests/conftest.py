@@ -0,0 +1,5 @@
+import os
+import sys
+
+# qry_doc_search.py is a script, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
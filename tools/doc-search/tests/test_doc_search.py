@@ -0,0 +1,221 @@
+"""Tests for chunking, the BM25 index, the numpy vector store and by-reference storage.
+
+None of these need Ollama: embeddings are random or derived from the text.
+"""
+
+import hashlib
+
+import pytest
+
+from qry_doc_search import LexicalIndex, NumpyVectorStore, QRYDocSearch, chunk_markdown
+
+np = pytest.importorskip("numpy")
+
+
+def fake_embeddings(texts, dim=32):
+    """Deterministic stand-in for Ollama: a vector seeded by each text's hash."""
+    return [np.random.default_rng(int(hashlib.sha256(text.encode()).hexdigest()[:8], 16))
+            .standard_normal(dim).tolist() for text in texts]
+
+
+# --- chunk_markdown -----------------------------------------------------------
+
+def test_chunk_markdown_packs_small_sections_together():
+    content = "# One\nalpha\n\n## Two\nbeta\n"
+    chunks = chunk_markdown(content, max_chars=2000)
+    assert [chunk["text"] for chunk in chunks] == [content]
+    assert chunks[0]["heading"] == "One"
+
+
+def test_chunk_markdown_splits_at_headings_when_full():
+    first = "# First\n" + "a " * 150 + "\n"
+    second = "# Second\n" + "b " * 150 + "\n"
+    chunks = chunk_markdown(first + second, max_chars=400)
+    assert [chunk["text"] for chunk in chunks] == [first, second]
+    assert [chunk["heading"] for chunk in chunks] == ["First", "Second"]
+
+
+def test_chunk_markdown_ignores_headings_inside_code_fences():
+    content = "# Real\nintro\n```\n# not a heading\n```\n" + "x " * 300
+    chunks = chunk_markdown(content, max_chars=200)
+    assert {chunk["heading"] for chunk in chunks} == {"Real"}
+
+
+def test_chunk_markdown_bounds_size_and_keeps_every_character():
+    content = "# Long\n" + "\n\n".join("word " * 120 for _ in range(5))
+    chunks = chunk_markdown(content, max_chars=300)
+    assert len(chunks) > 1
+    assert all(len(chunk["text"]) <= 300 for chunk in chunks)
+    assert "".join(chunk["text"] for chunk in chunks) == content
+
+
+def test_chunk_markdown_hard_wraps_unbroken_text():
+    chunks = chunk_markdown("z" * 1000, max_chars=300)
+    assert [len(chunk["text"]) for chunk in chunks] == [300, 300, 300, 100]
+
+
+def test_chunk_markdown_drops_blank_content():
+    assert chunk_markdown("\n\n   \n") == []
+
+
+# --- LexicalIndex -------------------------------------------------------------
+
+def lexical_record(doc_id, index, text):
+    return {"id": f"{doc_id}:{index}", "text": text,
+            "metadata": {"doc_id": doc_id, "file_path": f"{doc_id}.md"}}
+
+
+@pytest.fixture
+def lexical_index(tmp_path):
+    index = LexicalIndex(str(tmp_path / "lexical.db"))
+    index.add([
+        lexical_record("deploy", 0, "Deploying the gateway with docker compose"),
+        lexical_record("deploy", 1, "Rollback steps for a failed gateway deployment"),
+        lexical_record("wallet", 0, "Wallet keys and token balances"),
+    ])
+    yield index
+    index.conn.close()
+
+
+def test_lexical_search_ranks_matching_chunks(lexical_index):
+    assert lexical_index.count() == 3
+    results = lexical_index.search("gateway rollback", limit=10)
+    assert [result["id"] for result in results] == ["deploy:1", "deploy:0"]
+    assert results[0]["score"] > results[1]["score"] > 0
+    assert results[0]["metadata"]["file_path"] == "deploy.md"
+
+
+def test_lexical_search_filters_by_document(lexical_index):
+    assert lexical_index.search("gateway wallet", limit=10, doc_ids=["wallet"])[0]["id"] == "wallet:0"
+    assert lexical_index.search("gateway", limit=10, doc_ids=["wallet"]) == []
+
+
+def test_lexical_search_ignores_unknown_and_stopword_queries(lexical_index):
+    assert lexical_index.search("kubernetes", limit=10) == []
+    assert lexical_index.search("the and of", limit=10) == []
+
+
+def test_lexical_add_replaces_existing_chunk(lexical_index):
+    lexical_index.add([lexical_record("wallet", 0, "Hardware signer setup")])
+    assert lexical_index.count() == 3
+    assert lexical_index.search("token", limit=10) == []
+    assert lexical_index.search("signer", limit=10)[0]["id"] == "wallet:0"
+
+
+def test_lexical_delete_removes_every_chunk_of_a_document(lexical_index):
+    lexical_index.delete_documents(["deploy"])
+    assert lexical_index.count() == 1
+    assert lexical_index.search("gateway", limit=10) == []
+    assert lexical_index.search("wallet", limit=10)[0]["id"] == "wallet:0"
+
+
+# --- NumpyVectorStore ---------------------------------------------------------
+
+def store_rows(doc_ids, per_doc, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [f"{doc_id}:{i}" for doc_id in doc_ids for i in range(per_doc)]
+    embeddings = rng.standard_normal((len(ids), dim)).astype(np.float32)
+    metadatas = [{"doc_id": row_id.split(":")[0], "file_path": row_id.split(":")[0] + ".md"} for row_id in ids]
+    return ids, embeddings, [f"text of {row_id}" for row_id in ids], metadatas
+
+
+def test_numpy_store_upsert_delete_compact_query(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    ids, embeddings, documents, metadatas = store_rows(["a", "b", "c"], 4, dim=16)
+    store.upsert(ids[:8], embeddings[:8], documents[:8], metadatas[:8])
+    store.upsert(ids[8:], embeddings[8:], documents[8:], metadatas[8:])
+    assert store.count() == 12
+
+    store.delete_documents(["b"])
+    assert store.count() == 8
+    report = store.compact()
+    assert report == {"compacted": False, "segments": 2, "rows": 8, "dead_rows": 4}
+
+    report = store.compact(force=True)
+    assert report["compacted"] and report["rows"] == 8
+    assert store.compact(force=True) == {"compacted": False, "segments": 1, "rows": 8, "dead_rows": 0}
+
+    hits = store.query(embeddings[9].tolist(), 3)
+    assert hits[0]["id"] == "c:1"
+    assert hits[0]["document"] == "text of c:1"
+    assert hits[0]["distance"] == pytest.approx(0.0, abs=1e-5)
+    assert not any(hit["id"].startswith("b:") for hit in store.query(embeddings[4].tolist(), 8))
+    assert [hit["metadata"]["doc_id"] for hit in store.query(embeddings[0].tolist(), 8, doc_ids=["c"])] == ["c"] * 4
+
+    # A second handle on the same directory sees the compacted state
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert sorted(reopened.get_all()["ids"]) == sorted(ids[:4] + ids[8:])
+
+
+def test_numpy_store_replace_documents_swaps_rows(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    ids, embeddings, documents, metadatas = store_rows(["a", "b"], 3, dim=8)
+    store.upsert(ids, embeddings, documents, metadatas)
+    store.replace_documents(["a"], ["a:0"], embeddings[:1], ["new text"], metadatas[:1])
+    assert sorted(store.get_all()["ids"]) == ["a:0", "b:0", "b:1", "b:2"]
+    assert store.get_documents(["a:0"]) == {"a:0": "new text"}
+
+
+def test_numpy_store_int8_recall_matches_exact_search(tmp_path):
+    ids, embeddings, documents, metadatas = store_rows([f"d{i}" for i in range(100)], 5, dim=64, seed=1)
+    NumpyVectorStore(str(tmp_path)).upsert(ids, embeddings, documents, metadatas)
+    exact = NumpyVectorStore(str(tmp_path), quantization="none")
+    int8 = NumpyVectorStore(str(tmp_path), quantization="int8")
+
+    queries = (embeddings[::25] + 0.1 * np.random.default_rng(2).standard_normal((20, 64))).tolist()
+    recalls = []
+    for expected, found in zip(exact.query_many(queries, 10), int8.query_many(queries, 10)):
+        recalls.append(len({hit["id"] for hit in expected} & {hit["id"] for hit in found}) / 10)
+        # Shortlisted rows are re-ranked at full precision, so distances agree
+        common = {hit["id"]: hit["distance"] for hit in expected}
+        for hit in found:
+            if hit["id"] in common:
+                assert hit["distance"] == pytest.approx(common[hit["id"]], abs=1e-5)
+    assert sum(recalls) / len(recalls) >= 0.95
+
+    report = int8.benchmark_quantization(sample=20, k=10)
+    assert report["modes"]["int8"]["recall@10"] >= 0.95
+    assert report["modes"]["int8"]["bytes"] < report["modes"]["none"]["bytes"]
+
+
+# --- by-reference storage -----------------------------------------------------
+
+@pytest.fixture
+def reference_searcher(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    (repo / "docs").mkdir(parents=True)
+    (repo / "docs" / "guide.md").write_text("# Guide\nInstall the relay service first.\n\n## Usage\nRun it.\n")
+    searcher = QRYDocSearch(qry_repo_path=str(repo), chroma_db_path=str(tmp_path / "db"),
+                            vector_backend="numpy", storage_mode="reference", use_embedding_cache=False)
+    monkeypatch.setattr(searcher, "_embed_texts", fake_embeddings)
+    assert searcher.embed_all_documents()["embedded"] == 1
+    return searcher, repo / "docs" / "guide.md"
+
+
+def test_reference_load_content_reads_unchanged_file(reference_searcher):
+    searcher, path = reference_searcher
+    result = searcher.semantic_search("relay", mode="lexical", fields=["file_path", "content", "stale", "metadata"])[0]
+    assert result["content"] is None
+    assert "byte_start" in result["metadata"]
+    assert searcher.load_content(result) == path.read_text()
+    assert not result["stale"]
+
+
+def test_reference_load_content_flags_changed_file_stale(reference_searcher):
+    searcher, path = reference_searcher
+    result = searcher.semantic_search("relay", mode="lexical", fields=["file_path", "content", "stale", "metadata"])[0]
+    path.write_text("# Guide\nThe relay was replaced.\n")
+
+    assert searcher.load_content(result) == path.read_text()
+    assert result["stale"] is True
+    # The chunk's byte range no longer hashes to what was indexed
+    assert searcher._chunk_text(result["metadata"], "") is None
+
+
+def test_reference_load_content_flags_missing_file_stale(reference_searcher):
+    searcher, path = reference_searcher
+    result = searcher.semantic_search("relay", mode="lexical", fields=["file_path", "content", "stale", "metadata"])[0]
+    path.unlink()
+
+    assert searcher.load_content(result) is None
+    assert result["stale"] is True